@@ -5,10 +5,12 @@
 
 from fastapi import APIRouter
 
-from app.api.endpoints import posts
+from app.api.endpoints import diagnostics, posts
 
 
 api_router = APIRouter()
 
 # Включаем маршруты для постов под префиксом /posts
-api_router.include_router(posts.router, prefix="/posts", tags=["Посты"])
\ No newline at end of file
+api_router.include_router(posts.router, prefix="/posts", tags=["Посты"])
+# Служебные эндпоинты диагностики
+api_router.include_router(diagnostics.router, prefix="/diagnostics", tags=["Диагностика"])
\ No newline at end of file
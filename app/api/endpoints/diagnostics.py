@@ -0,0 +1,64 @@
+"""
+Модуль, содержащий служебные эндпоинты для диагностики работы приложения.
+"""
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.core.config import settings
+from app.core.database import get_pool_stats, slow_query_log
+
+router = APIRouter()
+
+
+async def require_debug_token(x_debug_token: str | None = Header(None)) -> None:
+    """
+    Зависимость для эндпоинтов, раскрывающих тексты и параметры запросов.
+
+    Если DEBUG_TOKEN не задан, эндпоинты недоступны (404).
+
+    Raises:
+        HTTPException: Если токен не задан в настройках или не совпадает.
+    """
+    if not settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_debug_token is None or not secrets.compare_digest(x_debug_token, settings.DEBUG_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Неверный токен отладки")
+
+
+@router.get("/pool")
+async def read_pool_stats():
+    """
+    Возвращает статистику пула соединений с базой данных.
+
+    Returns:
+        dict: Размер пула, занятые и переполняющие соединения, количество
+        таймаутов и время ожидания свободного соединения.
+    """
+    return get_pool_stats()
+
+
+@router.get("/slow-queries", dependencies=[Depends(require_debug_token)])
+async def read_slow_queries():
+    """
+    Возвращает последние медленные запросы к БД (новые первыми).
+
+    Требует заголовок `X-Debug-Token`, совпадающий с DEBUG_TOKEN.
+
+    Returns:
+        dict: Порог, доля запросов с планом и записи журнала: длительность,
+        метод CRUD, SQL, параметры и план EXPLAIN (если снимался).
+    """
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "explain_sample_rate": slow_query_log.explain_sample_rate,
+        "entries": list(reversed(slow_query_log.entries)),
+    }
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_debug_token)])
+async def clear_slow_queries():
+    """
+    Очищает журнал медленных запросов.
+    """
+    slow_query_log.clear()
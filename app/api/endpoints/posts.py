@@ -2,18 +2,237 @@
 """
 Модуль, содержащий API-эндпоинты для управления постами.
 """
+import asyncio
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Any, AsyncIterator, List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
 
-from app.schemas.post import PostCreate, PostUpdate, PostInDB
+from app.schemas.post import (
+    POST_LIST_FIELDS,
+    POST_SUMMARY_FIELDS,
+    PostActivityBucket,
+    PostActivityStats,
+    PostBulkDeleteResult,
+    PostBulkUpdate,
+    PostBulkUpdateResult,
+    PostChange,
+    PostChangesPage,
+    PostCreate,
+    PostFields,
+    PostInDB,
+    PostSummary,
+    PostTitleSuggestion,
+    PostUpdate,
+    partial_post_rows_adapter,
+    post_rows_adapter,
+)
 from app.crud.post import post_crud
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.events import BroadcasterClosed, Subscription, TooManySubscribers
+from app.core.database import get_db, get_read_db, read_session
+from app.core.http_cache import (
+    build_etag,
+    has_conditional_headers,
+    is_not_modified,
+    not_modified_response,
+    set_validators,
+)
+from app.core.query_budget import query_budget
+from app.core.pagination import (
+    InvalidCursorError,
+    decode_change_token,
+    decode_cursor,
+    decode_rank_cursor,
+    encode_change_token,
+    encode_cursor,
+    encode_rank_cursor,
+)
 
 router = APIRouter()
 
-@router.post("/", response_model=PostInDB, status_code=status.HTTP_201_CREATED)
+# Длительность интервала статистики и интервал по умолчанию для каждой детализации
+STATS_GRANULARITY = {
+    "hour": (timedelta(hours=1), timedelta(days=7)),
+    "day": (timedelta(days=1), timedelta(days=90)),
+}
+
+# SQLAlchemy разбивает многострочный INSERT на пакеты по 1000 строк (insertmanyvalues)
+BULK_INSERT_STATEMENTS = -(-settings.BULK_MAX_ITEMS // 1000)
+
+EXPORT_COLUMNS = ("id", "title", "content", "created_at", "updated_at")
+
+
+async def _export_rows(request: Request, fmt: str) -> AsyncIterator[bytes]:
+    """
+    Генерирует содержимое выгрузки постов порциями.
+
+    Сессия открывается внутри генератора, так как сессия из зависимости
+    get_db закрывается до начала отправки потокового ответа.
+
+    Args:
+        request (Request): Входящий запрос (выбор реплики для чтения).
+        fmt (str): Формат выгрузки: "ndjson" или "csv".
+
+    Yields:
+        bytes: Очередная порция выгрузки.
+    """
+    async with read_session(request) as session:
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue().encode()
+
+        async for rows in post_crud.stream_posts(session, fetch_size=settings.EXPORT_FETCH_SIZE):
+            if fmt == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(_csv_row(row) for row in rows)
+                yield buffer.getvalue().encode()
+            else:
+                yield b"".join(to_json(row) + b"\n" for row in rows)
+
+
+def _page_validators(
+    versions: list[tuple[int, datetime, datetime | None]],
+    fields: tuple[str, ...] | None = None,
+) -> tuple[str, datetime | None]:
+    """
+    Вычисляет ETag и Last-Modified страницы списка по версиям ее постов.
+
+    Набор полей входит в ETag, так как разные наборы — разные представления.
+    """
+    last_modified = max((updated_at or created_at for _, created_at, updated_at in versions), default=None)
+    return build_etag(fields, *versions), last_modified
+
+
+def _parse_fields(fields: str | None, view: str) -> tuple[str, ...] | None:
+    """
+    Определяет набор полей списка постов по параметрам fields и view.
+
+    Returns:
+        tuple[str, ...] | None: Поля в каноническом порядке или None для полного представления.
+
+    Raises:
+        HTTPException: Если запрошены неизвестные поля.
+    """
+    if fields is None:
+        return POST_SUMMARY_FIELDS if view == "summary" else None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(POST_LIST_FIELDS)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неизвестные поля: {', '.join(sorted(unknown))}. Доступны: {', '.join(POST_LIST_FIELDS)}"
+        )
+    return tuple(name for name in POST_LIST_FIELDS if name in requested)
+
+
+def _parse_ids(ids: str) -> list[int]:
+    """
+    Разбирает список ID через запятую (повторы удаляются, порядок сохраняется).
+
+    Raises:
+        HTTPException: Если список пуст, содержит не числа или длиннее BULK_MAX_ITEMS.
+    """
+    try:
+        parsed = list(dict.fromkeys(int(item) for item in ids.split(",") if item.strip()))
+    except ValueError:
+        parsed = []
+    if not parsed or len(parsed) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ожидается от 1 до {settings.BULK_MAX_ITEMS} целых ID через запятую"
+        )
+    return parsed
+
+
+def _rows_response(rows: list[dict[str, Any]], fields: tuple[str, ...] | None) -> Response:
+    """
+    Формирует JSON-ответ со списком постов из строк БД.
+
+    Быстрый путь сериализации: строки из БД сразу превращаются в JSON-байты
+    заранее построенным адаптером, без создания и повторной валидации
+    моделей PostInDB. Результат побайтно совпадает с выводом response_model.
+    """
+    if fields is None:
+        body = post_rows_adapter.dump_json(rows)
+    else:
+        body = partial_post_rows_adapter.dump_json(
+            [{name: row[name] for name in fields} for row in rows]
+        )
+    return Response(content=body, media_type="application/json")
+
+
+def _post_validators(
+    post_id: int, created_at: datetime, updated_at: datetime | None
+) -> tuple[str, datetime]:
+    """
+    Вычисляет ETag и Last-Modified поста.
+    """
+    return build_etag(post_id, created_at, updated_at), updated_at or created_at
+
+
+async def _event_stream(subscription: Subscription) -> AsyncIterator[bytes]:
+    """
+    Формирует поток Server-Sent Events из подписки на события постов.
+
+    Поток завершается при остановке рассылки (сигнал остановки приложения)
+    и не длится дольше POST_EVENTS_MAX_STREAM_SECONDS: после этого клиент
+    переподключается, а соединение не удерживает воркер бесконечно.
+    """
+    loop = asyncio.get_running_loop()
+    lifetime = settings.POST_EVENTS_MAX_STREAM_SECONDS
+    deadline = loop.time() + lifetime if lifetime > 0 else None
+    with subscription:
+        yield b"retry: 3000\n\n"
+        while True:
+            timeout = settings.POST_EVENTS_HEARTBEAT
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                timeout = min(timeout, remaining)
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if event is None:
+                if subscription.overflowed:
+                    yield b"event: overflow\ndata: {}\n\n"
+                return
+            # Событие операции записи содержит все затронутые посты;
+            # клиенту они отправляются по одному
+            op = event["op"]
+            yield b"".join(
+                b"event: " + op.encode() + b"\ndata: " + to_json({"op": op, **item}) + b"\n\n"
+                for item in event["items"]
+            )
+
+
+def _csv_row(row: dict[str, Any]) -> list[Any]:
+    """
+    Преобразует пост в строку CSV (даты в формате ISO 8601).
+    """
+    return [
+        value.isoformat() if hasattr(value, "isoformat") else value
+        for value in (row[column] for column in EXPORT_COLUMNS)
+    ]
+
+
+@router.post(
+    "/",
+    response_model=PostInDB,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(1))],
+)
 async def create_new_post(
     post_in: PostCreate,
     db: AsyncSession = Depends(get_db)
@@ -30,36 +249,490 @@ async def create_new_post(
     """
     return await post_crud.create_post(db=db, post_in=post_in)
 
-@router.get("/", response_model=List[PostInDB])
-async def read_posts(
-    skip: int = 0,
-    limit: int = 100,
+@router.post(
+    "/bulk",
+    response_model=List[PostInDB],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(BULK_INSERT_STATEMENTS))],
+)
+async def create_posts_bulk(
+    posts_in: Annotated[
+        List[PostCreate],
+        Body(min_length=1, max_length=settings.BULK_MAX_ITEMS),
+    ],
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Создает несколько постов за один запрос и одну транзакцию.
+
+    Каждый элемент валидируется отдельно: при ошибках ответ 422 содержит
+    индекс некорректного элемента в `loc`, и ни один пост не создается.
+
+    Args:
+        posts_in (List[PostCreate]): Данные для новых постов (не более BULK_MAX_ITEMS).
+        db (AsyncSession): Сессия базы данных.
+
+    Returns:
+        List[PostInDB]: Созданные посты в порядке входных данных.
+    """
+    return await post_crud.create_posts(db=db, posts_in=posts_in)
+
+@router.put("/bulk", response_model=PostBulkUpdateResult, dependencies=[Depends(query_budget(1))])
+async def update_posts_bulk(
+    bulk_in: PostBulkUpdate,
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Получает список всех постов.
+    Применяет одни и те же изменения к нескольким постам.
+
+    Выполняется одним UPDATE ... RETURNING в одной транзакции.
+
+    Args:
+        bulk_in (PostBulkUpdate): ID постов (не более BULK_MAX_ITEMS) и изменения.
+        db (AsyncSession): Сессия базы данных.
+
+    Returns:
+        PostBulkUpdateResult: Обновленные посты и ID, которых нет в БД.
+
+    Raises:
+        HTTPException: Если не передано ни одного изменения.
+    """
+    if not bulk_in.changes.model_fields_set:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Не передано ни одного изменения"
+        )
+    post_ids = list(dict.fromkeys(bulk_in.ids))
+    updated = await post_crud.update_posts(db=db, post_ids=post_ids, post_in=bulk_in.changes)
+    found = {post.id for post in updated}
+    return PostBulkUpdateResult(
+        updated=[PostInDB.model_validate(post, from_attributes=True) for post in updated],
+        not_found=[post_id for post_id in post_ids if post_id not in found],
+    )
+
+@router.delete("/bulk", response_model=PostBulkDeleteResult, dependencies=[Depends(query_budget(1))])
+async def delete_posts_bulk(
+    ids: str = Query(..., description="ID постов через запятую, например 1,5,42"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Удаляет несколько постов.
+
+    Выполняется одним DELETE ... RETURNING в одной транзакции.
+
+    Args:
+        ids (str): ID постов через запятую (не более BULK_MAX_ITEMS).
+        db (AsyncSession): Сессия базы данных.
+
+    Returns:
+        PostBulkDeleteResult: Удаленные посты и ID, которых нет в БД.
+
+    Raises:
+        HTTPException: Если список ID некорректен.
+    """
+    post_ids = _parse_ids(ids)
+    deleted = await post_crud.delete_posts(db=db, post_ids=post_ids)
+    found = {post.id for post in deleted}
+    return PostBulkDeleteResult(
+        deleted=[PostInDB.model_validate(post, from_attributes=True) for post in deleted],
+        not_found=[post_id for post_id in post_ids if post_id not in found],
+    )
+
+@router.get(
+    "/",
+    # Ответ формируется без валидации (_rows_response); схема описывает три варианта строки
+    response_model=List[PostInDB | PostSummary | PostFields],
+    dependencies=[Depends(query_budget(3))],
+)
+async def read_posts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=1000),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Поля через запятую, например id,title,created_at"),
+    view: Literal["full", "summary"] = "full",
+    count: Literal["none", "fast", "exact"] = "none",
+    ids: str | None = Query(None, description="ID постов через запятую, например 1,5,42"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Получает список постов, от новых к старым.
+
+    Параметр `fields` ограничивает набор полей (доступны поля PostInDB и
+    `excerpt` — отрывок content), `view=summary` — краткое представление
+    PostSummary (id, title, excerpt, created_at). В обоих случаях из БД
+    читаются только нужные столбцы; без content длинные тексты не
+    загружаются. Если передан `fields`, `view` не учитывается.
+
+    Поддерживает два режима пагинации:
+    - курсорный: клиент передает `cursor` из заголовка `X-Next-Cursor`
+      предыдущего ответа, стоимость запроса не зависит от глубины страницы;
+    - устаревший: `skip`/`limit` (OFFSET), используется, если `cursor` не передан.
+
+    Если за текущей страницей есть еще записи, курсор следующей страницы
+    возвращается в заголовке `X-Next-Cursor`.
+
+    Ответ содержит заголовки `ETag` и `Last-Modified`. На запрос с совпадающим
+    `If-None-Match` возвращается 304 по результату легкого запроса только
+    id и временных меток. `If-Modified-Since` для списка не учитывается:
+    время изменения страницы не отражает удаление постов.
+
+    Параметр `count` добавляет заголовок `X-Total-Count` с общим количеством
+    постов: `fast` — из счетчика, поддерживаемого триггерами БД (стоимость
+    не зависит от размера таблицы), `exact` — точный COUNT(*) по таблице.
+
+    Параметр `ids` возвращает посты с указанными ID (в порядке запроса,
+    отсутствующие пропускаются) одним запросом к БД вместо отдельного
+    запроса на каждый пост; пагинация при этом не применяется.
 
     Args:
-        skip (int): Количество пропускаемых постов.
+        request (Request): Входящий запрос (условные заголовки).
+        skip (int): Количество пропускаемых постов (устаревший режим).
         limit (int): Максимальное количество возвращаемых постов.
+        cursor (str | None): Курсор следующей страницы.
+        fields (str | None): Запрошенные поля через запятую.
+        view (str): Представление: "full" (по умолчанию) или "summary".
+        count (str): Подсчет общего количества: "none" (по умолчанию), "fast" или "exact".
+        ids (str | None): ID постов через запятую (не более BULK_MAX_ITEMS).
+        db (AsyncSession): Сессия базы данных.
+
+    Returns:
+        Response: JSON-список постов: PostInDB, PostSummary (view=summary)
+        или PostFields (только поля из fields).
+
+    Raises:
+        HTTPException: Если курсор или список ID некорректен или запрошены неизвестные поля.
+    """
+    selected_fields = _parse_fields(fields, view)
+    if ids is not None:
+        rows = await post_crud.get_posts_rows_by_ids(
+            db=db,
+            ids=_parse_ids(ids),
+            fields=selected_fields,
+            excerpt_length=settings.POST_EXCERPT_LENGTH,
+        )
+        etag, last_modified = _page_validators(
+            [(row["id"], row["created_at"], row["updated_at"]) for row in rows],
+            selected_fields,
+        )
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, last_modified)
+        response = _rows_response(rows, selected_fields)
+        set_validators(response, etag, last_modified)
+        return response
+
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Некорректный курсор"
+            )
+
+    # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница
+    if "if-none-match" in request.headers:
+        versions = await post_crud.get_posts_versions(db=db, skip=skip, limit=limit + 1, after=after)
+        etag, last_modified = _page_validators(versions, selected_fields)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag, last_modified)
+
+    rows = await post_crud.get_posts_rows(
+        db=db,
+        skip=skip,
+        limit=limit + 1,
+        after=after,
+        fields=selected_fields,
+        excerpt_length=settings.POST_EXCERPT_LENGTH,
+    )
+    etag, last_modified = _page_validators(
+        [(row["id"], row["created_at"], row["updated_at"]) for row in rows],
+        selected_fields,
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if rows:
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+    response = _rows_response(rows, selected_fields)
+    set_validators(response, etag, last_modified)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if count != "none":
+        total = await post_crud.count_posts(db=db, exact=count == "exact")
+        response.headers["X-Total-Count"] = str(total)
+    return response
+
+@router.get("/search", response_model=List[PostInDB], dependencies=[Depends(query_budget(1))])
+async def search_posts(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(20, ge=0, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Выполняет полнотекстовый поиск постов по заголовку и содержимому.
+
+    Результаты отсортированы по релевантности. Если есть следующая страница,
+    ее курсор возвращается в заголовке `X-Next-Cursor`.
+
+    Args:
+        response (Response): Ответ, в который добавляется заголовок с курсором.
+        q (str): Поисковый запрос.
+        limit (int): Максимальное количество возвращаемых постов.
+        cursor (str | None): Курсор следующей страницы.
+        db (AsyncSession): Сессия базы данных.
+
+    Returns:
+        List[PostInDB]: Найденные посты.
+
+    Raises:
+        HTTPException: Если курсор некорректен.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_rank_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Некорректный курсор"
+            )
+
+    results = await post_crud.search_posts(db=db, query=q, limit=limit + 1, after=after)
+    if len(results) > limit:
+        results = results[:limit]
+        if results:
+            last_post, last_rank = results[-1]
+            response.headers["X-Next-Cursor"] = encode_rank_cursor(last_rank, last_post.id)
+    return [post for post, _ in results]
+
+@router.get("/titles/suggest", response_model=List[PostTitleSuggestion], dependencies=[Depends(query_budget(1))])
+async def suggest_post_titles(
+    prefix: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Подсказывает заголовки постов, начинающиеся с префикса (автодополнение).
+
+    Поиск не учитывает регистр, результаты упорядочены по заголовку.
+    Повторные запросы того же префикса обслуживаются из кэша в памяти
+    без обращения к базе данных.
+
+    Args:
+        prefix (str): Начало заголовка.
+        limit (int): Максимальное количество подсказок.
+        db (AsyncSession): Сессия базы данных.
+
+    Returns:
+        List[PostTitleSuggestion]: Подсказки (ID поста и заголовок).
+    """
+    suggestions = await post_crud.suggest_titles(db=db, prefix=prefix, limit=limit)
+    return [PostTitleSuggestion(id=post_id, title=title) for post_id, title in suggestions]
+
+@router.get("/stats", response_model=PostActivityStats, dependencies=[Depends(query_budget(1))])
+async def read_post_stats(
+    granularity: Literal["hour", "day"] = "hour",
+    start: datetime | None = None,
+    end: datetime | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Возвращает активность публикаций: количество постов и среднюю длину
+    содержимого по часам или дням (UTC).
+
+    Данные читаются из сводки post_activity_rollups, которую триггеры БД
+    обновляют при создании, изменении и удалении постов. По умолчанию
+    интервал заканчивается текущим моментом и охватывает 7 дней (по часам)
+    или 90 дней (по дням). Границы выравниваются по началу часа или дня.
+
+    Args:
+        granularity (str): Детализация: "hour" или "day".
+        start (datetime | None): Начало интервала.
+        end (datetime | None): Конец интервала.
         db (AsyncSession): Сессия базы данных.
 
     Returns:
-        List[PostInDB]: Список постов.
+        PostActivityStats: Статистика по интервалам и итоги.
+
+    Raises:
+        HTTPException: Если интервал пуст или содержит больше POST_STATS_MAX_BUCKETS интервалов.
+    """
+    step, default_span = STATS_GRANULARITY[granularity]
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    def align(moment: datetime) -> datetime:
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return epoch + (moment - epoch) // step * step
+
+    end = align(end if end is not None else datetime.now(timezone.utc) + step)
+    start = align(start) if start is not None else end - default_span
+    if start >= end or (end - start) // step > settings.POST_STATS_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Интервал должен быть непустым и содержать не больше {settings.POST_STATS_MAX_BUCKETS} интервалов"
+        )
+
+    rows = await post_crud.get_activity_stats(db=db, granularity=granularity, start=start, end=end)
+    total_posts = sum(posts for _, posts, _ in rows)
+    total_length = sum(length for _, _, length in rows)
+    return PostActivityStats(
+        granularity=granularity,
+        start=start,
+        end=end,
+        total_posts=total_posts,
+        avg_content_length=total_length / total_posts if total_posts else None,
+        buckets=[
+            PostActivityBucket(start=bucket_start, posts=posts, avg_content_length=length / posts)
+            for bucket_start, posts, length in rows
+        ],
+    )
+
+@router.get("/export", dependencies=[Depends(query_budget(1))])
+async def export_posts(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+):
+    """
+    Потоково выгружает все посты в формате NDJSON или CSV.
+
+    Строки читаются из серверного курсора порциями по EXPORT_FETCH_SIZE,
+    поэтому потребление памяти не зависит от размера таблицы.
+
+    Args:
+        request (Request): Входящий запрос.
+        fmt (str): Формат выгрузки: "ndjson" (по умолчанию) или "csv".
+
+    Returns:
+        StreamingResponse: Потоковый ответ с выгрузкой.
     """
-    posts = await post_crud.get_posts(db=db, skip=skip, limit=limit)
-    return posts
+    if fmt == "csv":
+        return StreamingResponse(
+            _export_rows(request, fmt),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="posts.csv"'},
+        )
+    return StreamingResponse(_export_rows(request, fmt), media_type="application/x-ndjson")
+
+@router.get("/stream", dependencies=[Depends(query_budget(0))])
+async def stream_post_events():
+    """
+    Поток событий о созданиях, изменениях и удалениях постов (Server-Sent Events).
+
+    Каждое событие — `event: create|update|delete` и JSON с `op`, `id`
+    и данными поста (`post`, кроме удаления); массовая операция дает по
+    событию на каждый пост. При простое отправляются комментарии-пинги.
+    Клиент, не успевающий получать события, получает
+    `event: overflow`, и поток завершается: пропущенные изменения нужно
+    получить через `/changes` и переподключиться.
+
+    Returns:
+        StreamingResponse: Поток text/event-stream.
 
-@router.get("/{post_id}", response_model=PostInDB)
+    Raises:
+        HTTPException: 503, если достигнут лимит подключений или приложение останавливается.
+    """
+    try:
+        subscription = post_crud.events.subscribe()
+    except BroadcasterClosed:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер останавливается",
+            headers={"Retry-After": "1"},
+        )
+    except TooManySubscribers:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Слишком много подключений к потоку событий",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        _event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/changes", response_model=PostChangesPage, dependencies=[Depends(query_budget(3))])
+async def read_post_changes(
+    since: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Возвращает изменения постов (создания, обновления, удаления) после токена.
+
+    Клиент сохраняет `next_token` и передает его как `since` в следующий
+    запрос; без `since` лента выдается с начала (полная синхронизация).
+    Если `has_more` истинно, следующую порцию нужно запросить сразу.
+    Изменения еще не завершенных транзакций не выдаются, пока те не
+    завершатся, поэтому медленная транзакция не приводит к пропускам.
+
+    Args:
+        since (str | None): Токен из предыдущего ответа.
+        limit (int): Максимальное количество изменений в ответе.
+        db (AsyncSession): Сессия базы данных.
+
+    Returns:
+        PostChangesPage: Изменения, токен для следующего запроса и признак продолжения.
+
+    Raises:
+        HTTPException: Если токен некорректен.
+    """
+    position = (0, 0)
+    if since is not None:
+        try:
+            position = decode_change_token(since)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Некорректный токен"
+            )
+
+    # Запрашиваем на одно изменение больше, чтобы узнать, есть ли продолжение
+    watermark = await post_crud.get_change_watermark(db=db)
+    changes = await post_crud.get_changes(db=db, since=position, limit=limit + 1, watermark=watermark)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if changes:
+        position = changes[-1][0]
+    if not has_more and watermark is not None:
+        # Все изменения ниже границы выданы; будущие изменения получат ID
+        # транзакции не меньше границы, поэтому токен можно продвинуть до нее
+        position = max(position, (watermark, 0))
+    return PostChangesPage(
+        changes=[
+            PostChange(op=op, id=value.id, post=PostInDB.model_validate(value, from_attributes=True))
+            if op == "upsert" else PostChange(op=op, id=value)
+            for _, op, value in changes
+        ],
+        next_token=encode_change_token(position),
+        has_more=has_more,
+    )
+
+@router.get("/{post_id}", response_model=PostInDB, dependencies=[Depends(query_budget(2))])
 async def read_post_by_id(
     post_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получает пост по его ID.
 
+    Ответ содержит заголовки `ETag` и `Last-Modified`. Условный запрос
+    (`If-None-Match` / `If-Modified-Since`) проверяется по временным меткам
+    поста без загрузки его содержимого; если версия у клиента актуальна,
+    возвращается 304 без тела.
+
     Args:
         post_id (int): ID поста.
+        request (Request): Входящий запрос (условные заголовки).
+        response (Response): Ответ, в который добавляются заголовки.
         db (AsyncSession): Сессия базы данных.
 
     Returns:
@@ -68,15 +741,23 @@ async def read_post_by_id(
     Raises:
         HTTPException: Если пост не найден.
     """
-    post = await post_crud.get_post(db=db, post_id=post_id)
+    if has_conditional_headers(request):
+        version = await post_crud.get_post_version(db=db, post_id=post_id)
+        if version is not None:
+            etag, last_modified = _post_validators(post_id, *version)
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+
+    post = await post_crud.get_post_cached(db=db, post_id=post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Пост не найден"
         )
+    set_validators(response, *_post_validators(post.id, post.created_at, post.updated_at))
     return post
 
-@router.put("/{post_id}", response_model=PostInDB)
+@router.put("/{post_id}", response_model=PostInDB, dependencies=[Depends(query_budget(1))])
 async def update_existing_post(
     post_id: int,
     post_in: PostUpdate,
@@ -104,7 +785,7 @@ async def update_existing_post(
         )
     return updated_post
 
-@router.delete("/{post_id}", response_model=PostInDB)
+@router.delete("/{post_id}", response_model=PostInDB, dependencies=[Depends(query_budget(1))])
 async def delete_existing_post(
     post_id: int,
     db: AsyncSession = Depends(get_db)
@@ -0,0 +1,106 @@
+"""
+Модуль группировки (micro-batching) операций.
+
+MicroBatcher собирает элементы, поступающие от конкурентных вызовов в течение
+короткого окна (или до заполнения пакета), и обрабатывает их одним вызовом
+функции сброса. Каждый вызывающий получает свой результат.
+"""
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Generic, Sequence, TypeVar
+
+from app.core.metrics import write_batch_size
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Группирует конкурентные вызовы в пакеты.
+
+    Пакет отправляется, когда с момента поступления первого элемента прошло
+    `window` секунд или набралось `max_size` элементов. Сброс выполняется
+    в отдельной задаче с пустым контекстом, поэтому его запросы к БД не
+    учитываются в статистике HTTP-запроса, первым попавшего в пакет.
+
+    Args:
+        flush (Callable): Обрабатывает пакет и возвращает результаты в том же
+            порядке. Элемент-исключение в результатах передается только
+            соответствующему вызывающему; исключение самой функции — всем.
+        max_size (int): Максимальный размер пакета.
+        window (float): Окно сбора пакета в секундах.
+        name (str): Имя операции (метка метрики размера пакетов).
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[T]], Awaitable[Sequence[R | BaseException]]],
+        max_size: int,
+        window: float,
+        name: str,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size должен быть не меньше 1")
+        self.flush = flush
+        self.max_size = max_size
+        self.window = window
+        self.name = name
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        """
+        Добавляет элемент в текущий пакет и ждет результата его обработки.
+
+        Args:
+            item (T): Элемент для обработки.
+
+        Returns:
+            R: Результат обработки элемента.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+        return await future
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        write_batch_size.observe(len(batch), self.name)
+        try:
+            results = await self.flush([item for item, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if future.done():  # Вызывающий отменил ожидание
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """
+        Отправляет накопленный пакет и дожидается завершения всех сбросов.
+        """
+        self._start_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,240 @@
+"""
+Модуль кэширования.
+
+Определяет интерфейс бэкенда кэша и его реализацию по умолчанию — LRU-кэш
+в памяти процесса с ограничением по размеру и времени жизни записей.
+Интерфейс асинхронный, чтобы позже можно было подключить разделяемый кэш
+(например, Redis) без изменения вызывающего кода.
+"""
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core.config import settings
+
+
+class CacheBackend(ABC):
+    """
+    Базовый класс бэкенда кэша.
+    """
+
+    @abstractmethod
+    async def get(self, key: Hashable) -> Any | None:
+        """
+        Возвращает значение по ключу или None, если записи нет или она устарела.
+        """
+
+    @abstractmethod
+    async def set(self, key: Hashable, value: Any) -> None:
+        """
+        Сохраняет значение по ключу.
+        """
+
+    @abstractmethod
+    async def delete(self, key: Hashable) -> None:
+        """
+        Удаляет запись по ключу (если она есть).
+        """
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """
+        Удаляет все записи.
+        """
+
+    @abstractmethod
+    def stats(self) -> dict[str, int]:
+        """
+        Возвращает статистику работы кэша (попадания, промахи, размер).
+        """
+
+
+class LRUCache(CacheBackend):
+    """
+    LRU-кэш в памяти процесса с TTL и ограничением количества записей.
+
+    Args:
+        maxsize (int): Максимальное количество записей; при переполнении
+            вытесняется давно не использовавшаяся запись.
+        ttl (float): Время жизни записи в секундах.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: Hashable) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+        }
+
+
+class PrefixCache:
+    """
+    Кэш результатов поиска по префиксу строки (автодополнение) в памяти процесса.
+
+    Ключ — префикс в нижнем регистре и лимит, значение — список пар
+    (id, строка). Запись инвалидируется только тогда, когда изменение может
+    повлиять на результат: новая строка начинается с префикса записи или
+    измененный элемент уже есть в результате. Обе проверки идут по индексам
+    (префикс -> ключи, id -> ключи), поэтому стоимость инвалидации не зависит
+    от размера кэша. Поколение (generation) позволяет читателю не сохранять
+    результат запроса, во время которого произошло изменение.
+
+    Args:
+        maxsize (int): Максимальное количество записей (LRU).
+        ttl (float): Время жизни записи в секундах.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[tuple[str, int], tuple[float, list[tuple[int, str]]]] = OrderedDict()
+        self._by_prefix: dict[str, set[tuple[str, int]]] = {}
+        self._by_item: dict[int, set[tuple[str, int]]] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, prefix: str, limit: int) -> list[tuple[int, str]] | None:
+        key = (prefix, limit)
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            if item is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, prefix: str, limit: int, value: list[tuple[int, str]], generation: int) -> None:
+        """
+        Сохраняет результат, если с начала его чтения (`generation`) не было изменений.
+        """
+        if generation != self.generation:
+            return
+        key = (prefix, limit)
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._by_prefix.setdefault(prefix, set()).add(key)
+        for item_id, _ in value:
+            self._by_item.setdefault(item_id, set()).add(key)
+        while len(self._data) > self.maxsize:
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    def invalidate(self, item_id: int, value: str | None) -> None:
+        """
+        Удаляет записи, на которые влияет изменение элемента.
+
+        Args:
+            item_id (int): ID созданного, измененного или удаленного элемента.
+            value (str | None): Новое значение строки (None — элемент удален).
+        """
+        self.generation += 1
+        stale = set(self._by_item.get(item_id, ()))
+        if value is not None:
+            lowered = value.lower()
+            for end in range(1, len(lowered) + 1):
+                stale.update(self._by_prefix.get(lowered[:end], ()))
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
+
+    def _remove(self, key: tuple[str, int]) -> None:
+        _, value = self._data.pop(key)
+        self._discard(self._by_prefix, key[0], key)
+        for item_id, _ in value:
+            self._discard(self._by_item, item_id, key)
+
+    @staticmethod
+    def _discard(index: dict, index_key: Hashable, key: tuple[str, int]) -> None:
+        keys = index.get(index_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[index_key]
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._data.clear()
+        self._by_prefix.clear()
+        self._by_item.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._data),
+        }
+
+
+def create_post_cache() -> CacheBackend | None:
+    """
+    Создает кэш постов согласно настройкам приложения.
+
+    Кэш в памяти воркера сбрасывается после записей других воркеров только
+    через мост LISTEN/NOTIFY, поэтому без него при нескольких воркерах
+    кэш не создается (иначе воркер отдавал бы устаревший пост до TTL).
+
+    Returns:
+        CacheBackend | None: Бэкенд кэша или None, если кэширование отключено.
+    """
+    if not settings.POST_CACHE_ENABLED:
+        return None
+    if settings.WEB_CONCURRENCY > 1 and not settings.POST_EVENTS_PG_NOTIFY:
+        return None
+    return LRUCache(maxsize=settings.POST_CACHE_MAXSIZE, ttl=settings.POST_CACHE_TTL)
+
+
+def create_title_prefix_cache() -> PrefixCache | None:
+    """
+    Создает кэш автодополнения заголовков согласно настройкам приложения.
+
+    Returns:
+        PrefixCache | None: Кэш или None, если он отключен.
+    """
+    if settings.TITLE_SUGGEST_CACHE_MAXSIZE <= 0:
+        return None
+    return PrefixCache(maxsize=settings.TITLE_SUGGEST_CACHE_MAXSIZE, ttl=settings.TITLE_SUGGEST_CACHE_TTL)
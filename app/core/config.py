@@ -33,6 +33,28 @@ class Settings(BaseSettings):
 
     TEST_DB_URL: str
 
+    # Пул соединений с БД (не используется в режиме TEST)
+    DB_POOL_SIZE: int = 5  # Количество постоянно открытых соединений
+    DB_MAX_OVERFLOW: int = 10  # Дополнительные соединения сверх DB_POOL_SIZE при пиковой нагрузке
+    DB_POOL_TIMEOUT: float = 30.0  # Сколько секунд ждать свободного соединения
+    DB_POOL_RECYCLE: int = -1  # Пересоздавать соединения старше N секунд (-1 — не пересоздавать)
+    DB_POOL_PRE_PING: bool = False  # Проверять соединение перед выдачей из пула
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Размер кэша подготовленных выражений asyncpg (0 — отключен)
+    # Запуск и остановка приложения
+    DB_CREATE_ALL_ON_STARTUP: bool = False  # Создавать таблицы при запуске (только в режиме DEV)
+    DB_WARMUP_CONNECTIONS: int = 2  # Сколько соединений пула открыть и прогреть при запуске (0 — не прогревать)
+
+    # Реплики для чтения (URL через запятую, пусто — все запросы идут в основную БД)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_ROUTING: Literal["round_robin", "least_connections"] = "round_robin"  # Выбор реплики для чтения
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # Сколько секунд после записи клиент читает с основной БД (0 — отключено)
+
+    # Диагностика запросов к БД (журнал медленных запросов и бюджет запросов)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # Запросы дольше порога попадают в журнал медленных запросов (< 0 — отключено)
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0  # Доля медленных запросов, для которых снимается план EXPLAIN (PostgreSQL)
+    SLOW_QUERY_LOG_SIZE: int = 100  # Сколько последних медленных запросов хранить для /diagnostics/slow-queries
+    QUERY_BUDGET_ENFORCE: bool = False  # Завершать ошибкой запросы, превысившие бюджет запросов к БД (для DEV и тестов)
+
     # Настройки приложения
     PROJECT_NAME: str = "SimplePostApp"
     API_V1_STR: str = "/api/v1"
@@ -40,5 +62,62 @@ class Settings(BaseSettings):
     # Секретный ключ для будущих функций (например, JWT) - обязательно генерируйте сложный!
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    DEBUG_TOKEN: str | None = None  # Токен служебных эндпоинтов с данными запросов (заголовок X-Debug-Token); None — эндпоинты отключены
+
+    # Кэш постов (чтение по ID)
+    # Кэш в памяти воркера; записи других воркеров сбрасывают его только через
+    # POST_EVENTS_PG_NOTIFY, поэтому при WEB_CONCURRENCY > 1 без него кэш отключается
+    POST_CACHE_ENABLED: bool = True
+    POST_CACHE_MAXSIZE: int = 1024  # Максимальное количество постов в кэше
+    POST_CACHE_TTL: float = 30.0  # Время жизни записи в секундах
+
+    # Статистика активности (сводка post_activity_rollups)
+    POST_STATS_MAX_BUCKETS: int = 2000  # Максимальное количество интервалов в одном запросе /posts/stats
+
+    # Автодополнение заголовков (кэш результатов по префиксу)
+    TITLE_SUGGEST_CACHE_MAXSIZE: int = 4096  # Максимальное количество префиксов в кэше (0 — кэш отключен)
+    TITLE_SUGGEST_CACHE_TTL: float = 30.0  # Время жизни записи в секундах (изменения из других воркеров)
+
+    # Объединение одинаковых конкурентных чтений (single-flight) поста по ID и страниц списка
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_TTL: float = 0.0  # Время хранения результата после чтения в секундах (0 — только одновременные запросы)
+
+    # Главная страница (серверный рендеринг первой страницы постов)
+    FRONTEND_PAGE_SIZE: int = 10  # Количество постов на главной странице
+    FRAGMENT_CACHE_MAXSIZE: int = 32  # Максимальное количество отрендеренных фрагментов в кэше
+    FRAGMENT_CACHE_TTL: float = 300.0  # Время жизни фрагмента в секундах
+    TEMPLATE_BYTECODE_CACHE_DIR: str | None = None  # Каталог байткода шаблонов (None — временный каталог)
+
+    # Краткое представление постов в списке (view=summary)
+    POST_EXCERPT_LENGTH: int = 200  # Длина отрывка content в символах
+
+    # Массовое создание постов
+    BULK_MAX_ITEMS: int = 1000  # Максимальное количество постов в одном запросе
+
+    # Группировка конкурентных созданий постов в один INSERT (по умолчанию отключена)
+    POST_CREATE_COALESCE: bool = False
+    POST_CREATE_BATCH_WINDOW: float = 0.005  # Окно сбора пакета в секундах
+    POST_CREATE_BATCH_MAX: int = 100  # Максимальное количество постов в пакете
+
+    # События об изменениях постов (Server-Sent Events)
+    POST_EVENTS_MAX_SUBSCRIBERS: int = 1000  # Максимальное количество подключений к потоку в одном воркере
+    POST_EVENTS_QUEUE_SIZE: int = 100  # Недоставленных операций записи (массовая — одна) на подписчика, после чего он отключается
+    POST_EVENTS_HEARTBEAT: float = 15.0  # Интервал комментариев-пингов в потоке в секундах
+    POST_EVENTS_MAX_STREAM_SECONDS: float = 300.0  # Максимальная длительность одного потока (клиент переподключается); 0 — без ограничения
+    POST_EVENTS_PG_NOTIFY: bool = False  # Пересылать события и сброс кэшей между воркерами через PostgreSQL LISTEN/NOTIFY
+    WEB_CONCURRENCY: int = 1  # Количество воркеров uvicorn (uvicorn берет из этой же переменной значение --workers по умолчанию)
+
+    # Потоковая выгрузка постов
+    EXPORT_FETCH_SIZE: int = 1000  # Количество строк, получаемых из курсора БД за раз
+
+    # Полнотекстовый поиск (PostgreSQL)
+    SEARCH_TS_CONFIG: str = "russian"  # Конфигурация текстового поиска для to_tsvector
+
+    @property
+    def replica_urls(self) -> list[str]:
+        """
+        Список URL реплик из DATABASE_REPLICA_URLS.
+        """
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
 
 settings = Settings()
\ No newline at end of file
@@ -3,16 +3,74 @@
 Модуль для настройки соединения с базой данных PostgreSQL с помощью SQLAlchemy.
 Определяет асинхронный движок, фабрику сессий и базовый класс для декларативных моделей.
 """
-from typing import AsyncGenerator
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable
 
-from sqlalchemy import NullPool
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import AsyncAdaptedQueuePool, NullPool, event, exc, make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import functions
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
+from starlette.requests import HTTPConnection
 from app.core.config import settings
+from app.core.metrics import record_query, register_stats_gauge
+from app.core.query_budget import check_query_budget
+from app.core.replicas import ReplicaRouter, prefers_primary
+from app.core.slow_queries import SlowQueryLog
 import asyncio
 
-# Создаем асинхронный движок SQLAlchemy
-# echo=True для логирования SQL-запросов (отключить в продакшене)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, собирающий статистику ожидания соединений.
+
+    Время ожидания включает и установку нового соединения, если оно
+    создается сверх уже открытых.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.acquisitions += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def _engine_params(url: str) -> dict:
+    """
+    Собирает параметры движка (пул соединений, драйвер) из настроек.
+
+    Args:
+        url (str): URL базы данных.
+
+    Returns:
+        dict: Именованные аргументы для create_async_engine.
+    """
+    params = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if make_url(url).get_driver_name() == "asyncpg":
+        params["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return params
 
 
 # Определяем параметры подключения к БД в зависимости от режима работы (тестовый/обычный)
@@ -21,10 +79,73 @@ if settings.MODE == "TEST":
     DATABASE_PARAMS = {"poolclass": NullPool}  # Отключаем пул соединений для тестов
 else:
     DATABASE_URL = settings.DATABASE_URL  # URL основной БД
-    DATABASE_PARAMS = {}  # Используем стандартный пул соединений
+    DATABASE_PARAMS = _engine_params(DATABASE_URL)  # Пул соединений с параметрами из настроек
+
+
+# Журнал медленных запросов (см. /api/v1/diagnostics/slow-queries)
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    maxlen=settings.SLOW_QUERY_LOG_SIZE,
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Проверяет бюджет запросов и запоминает время начала выполнения запроса к БД.
+    """
+    check_query_budget(statement)
+    context._query_start_time = time.perf_counter()
 
 
-engine = create_async_engine(DATABASE_URL, echo=False, **DATABASE_PARAMS)
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Учитывает время выполнения запроса к БД в метриках и журнале медленных запросов.
+    """
+    duration = time.perf_counter() - context._query_start_time
+    record_query(duration)
+    slow_query_log.observe(conn, statement, parameters, duration)
+
+
+def _sqlite_lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _sqlite_connect(dbapi_connection, connection_record):
+    """
+    Заменяет встроенную функцию lower() SQLite, которая меняет регистр
+    только ASCII-символов, на lower() Python (как в PostgreSQL, с учетом
+    кириллицы). Функция детерминирована и используется в индексе
+    ix_posts_title_prefix.
+    """
+    dbapi_connection.create_function("lower", 1, _sqlite_lower, deterministic=True)
+
+
+def _create_engine(url: str, **params) -> AsyncEngine:
+    """
+    Создает асинхронный движок SQLAlchemy с учетом запросов в метриках и бюджете.
+    """
+    # echo=True для логирования SQL-запросов (отключить в продакшене)
+    new_engine = create_async_engine(url, echo=False, **params)
+    event.listen(new_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(new_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _sqlite_connect)
+    return new_engine
+
+
+# Создаем асинхронный движок SQLAlchemy (основная БД: все записи)
+engine = _create_engine(DATABASE_URL, **DATABASE_PARAMS)
+
+# Движки реплик для чтения
+replica_engines = [
+    _create_engine(url, **({"poolclass": NullPool} if settings.MODE == "TEST" else _engine_params(url)))
+    for url in settings.replica_urls
+]
+replica_router: ReplicaRouter[AsyncEngine] | None = (
+    ReplicaRouter(replica_engines, settings.REPLICA_ROUTING) if replica_engines else None
+)
+
 
 # Создаем асинхронную фабрику сессий
 # expire_on_commit=False предотвращает истечение срока действия объектов после commit,
@@ -39,14 +160,141 @@ engine = create_async_engine(DATABASE_URL, echo=False, **DATABASE_PARAMS)
 
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
+
+def get_pool_stats() -> dict:
+    """
+    Возвращает статистику пула соединений основного движка.
+
+    Returns:
+        dict: Размер пула, выданные и переполняющие соединения, а также
+        количество получений соединения, таймаутов и время ожидания.
+    """
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"pool_class": type(pool).__name__}
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "acquisitions": pool.acquisitions,
+        "timeouts": pool.timeouts,
+        "wait_seconds_total": pool.wait_seconds_total,
+        "wait_seconds_max": pool.wait_seconds_max,
+    }
+
+
+# pool_class — строка и в метрику не попадает
+register_stats_gauge("db_pool", "Состояние пула соединений с БД", get_pool_stats)
+
 # Асинхронный генератор для получения сессии БД
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:  # Создаем новую сессию
         yield session  # Возвращаем сессию через yield (паттерн dependency injection)
 
 
+# Признаки сессии чтения в AsyncSession.info: сессия на реплике (данные могут
+# отставать) и сессия клиента, закрепленного за основной БД после записи
+# (read-your-writes), которому нельзя отдавать данные из общих кэшей.
+REPLICA_SESSION = "replica"
+PRIMARY_PINNED_SESSION = "primary_pinned"
+
+
+@asynccontextmanager
+async def read_session(connection: HTTPConnection | None = None) -> AsyncIterator[AsyncSession]:
+    """
+    Открывает сессию только для чтения: на реплике, если они настроены.
+
+    Сессия открывается на основной БД, если реплик нет или клиент недавно
+    выполнял запись (cookie read-your-writes, см. app.core.replicas).
+    Сессия помечается в `info` признаком REPLICA_SESSION или
+    PRIMARY_PINNED_SESSION.
+
+    Args:
+        connection (HTTPConnection | None): Входящий запрос.
+    """
+    router = replica_router
+    if router is None or (connection is not None and prefers_primary(connection)):
+        async with async_session() as session:
+            session.info[PRIMARY_PINNED_SESSION] = router is not None
+            yield session
+        return
+
+    replica = router.acquire()
+    try:
+        async with async_session(bind=replica) as session:
+            session.info[REPLICA_SESSION] = True
+            yield session
+    finally:
+        router.release(replica)
+
+
+async def get_read_db(request: HTTPConnection) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Зависимость FastAPI: сессия для эндпоинтов, которые только читают данные.
+    """
+    async with read_session(request) as session:
+        yield session
+
+
+async def warm_up_engine(
+    target: AsyncEngine,
+    connections: int,
+    warm_up: Callable[[AsyncSession], Awaitable[None]] | None = None,
+) -> None:
+    """
+    Заранее открывает соединения пула и выполняет на них частые запросы.
+
+    Соединения открываются одновременно и возвращаются в пул, поэтому первые
+    запросы после запуска не тратят время на установку соединения. Функция
+    `warm_up` выполняется на каждом открытом соединении (подготовленные
+    выражения asyncpg кэшируются отдельно в каждом соединении).
+
+    Args:
+        target (AsyncEngine): Движок, пул которого нужно прогреть.
+        connections (int): Количество соединений.
+        warm_up (Callable | None): Выполняет частые запросы в переданной сессии.
+    """
+    async def open_connection():
+        connection = await target.connect()
+        if warm_up is not None:
+            async with async_session(bind=connection) as session:
+                await warm_up(session)
+        return connection
+
+    opened = await asyncio.gather(*(open_connection() for _ in range(connections)), return_exceptions=True)
+    errors = [result for result in opened if isinstance(result, BaseException)]
+    for connection in opened:
+        if not isinstance(connection, BaseException):
+            await connection.close()  # Соединение возвращается в пул
+    if errors:
+        raise errors[0]
+
+
+async def dispose_engines() -> None:
+    """
+    Закрывает соединения основного движка и движков реплик.
+    """
+    for target in (engine, *replica_engines):
+        await target.dispose()
+
+
 Base = declarative_base()
 
+
+@compiles(functions.now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    """
+    Компилирует func.now() для SQLite (используется как локальная замена PostgreSQL).
+
+    Стандартный CURRENT_TIMESTAMP в SQLite имеет точность до секунды и формат,
+    отличный от формата хранения DateTime в SQLAlchemy, из-за чего сравнение
+    временных меток (например, в курсорной пагинации) работает некорректно.
+    """
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
+
 # async def get_db():
 #     """
 #     Генератор зависимостей для FastAPI, предоставляющий асинхронную сессию БД.
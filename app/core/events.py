@@ -0,0 +1,284 @@
+"""
+Модуль рассылки событий об изменениях постов подписчикам (Server-Sent Events).
+
+Broadcaster раздает события подписчикам внутри процесса. Событие описывает
+одну операцию записи: {"op": ..., "items": [{"id": ..., "post": ...}, ...]}
+(массовая операция — одно событие). У каждого подписчика
+ограниченная очередь: медленный подписчик, не успевающий забирать события,
+отключается с событием overflow (клиент догоняет изменения через ленту
+/api/v1/posts/changes и переподключается), а не накапливает память и не
+задерживает остальных. Количество подписчиков ограничено.
+
+PgNotifyBridge (необязательно, только PostgreSQL) пересылает события через
+LISTEN/NOTIFY, чтобы подписчики любого воркера uvicorn получали изменения,
+сделанные в других воркерах, а кэши воркеров сбрасывались после чужих записей.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import make_url
+
+logger = logging.getLogger(__name__)
+
+# Максимальный размер полезной нагрузки NOTIFY в PostgreSQL — 8000 байт
+NOTIFY_PAYLOAD_LIMIT = 7900
+# Элементов {"id":N} в одном уведомлении без данных постов: ID не длиннее
+# 10 цифр, 400 элементов занимают меньше NOTIFY_PAYLOAD_LIMIT
+NOTIFY_IDS_PER_PAYLOAD = 400
+
+
+class TooManySubscribers(Exception):
+    """
+    Исключение, возникающее при превышении лимита подписчиков.
+    """
+
+
+class BroadcasterClosed(Exception):
+    """
+    Исключение, возникающее при подписке после остановки рассылки.
+    """
+
+
+class Subscription:
+    """
+    Подписка на события с ограниченной очередью.
+
+    Args:
+        broadcaster (Broadcaster): Источник событий.
+        queue_size (int): Максимальное количество недоставленных событий
+            (операций записи).
+    """
+
+    def __init__(self, broadcaster: "Broadcaster", queue_size: int):
+        self._broadcaster = broadcaster
+        self._queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def put(self, event: dict[str, Any]) -> None:
+        """
+        Добавляет событие в очередь. При переполнении очередь очищается,
+        подписка помечается как переполненная и завершается.
+        """
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    def close(self) -> None:
+        """
+        Завершает подписку: ожидающий get получает None.
+        """
+        self._broadcaster.unsubscribe(self)
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self) -> dict[str, Any] | None:
+        """
+        Ожидает следующее событие.
+
+        Returns:
+            dict | None: Событие или None, если подписка завершена
+            (переполнение очереди или остановка рассылки).
+        """
+        return await self._queue.get()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class Broadcaster:
+    """
+    Рассылка событий подписчикам текущего процесса.
+
+    Args:
+        max_subscribers (int): Максимальное количество одновременных подписчиков.
+        queue_size (int): Размер очереди каждого подписчика (в операциях записи).
+    """
+
+    def __init__(self, max_subscribers: int, queue_size: int):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.bridge: "PgNotifyBridge | None" = None
+        self._subscribers: set[Subscription] = set()
+        self.closed = False
+        self.published = 0
+        self.overflows = 0
+
+    @property
+    def active(self) -> bool:
+        """
+        Нужно ли формировать события: есть подписчики или события уходят
+        в другие воркеры через мост.
+        """
+        return bool(self._subscribers) or self.bridge is not None
+
+    def subscribe(self) -> Subscription:
+        """
+        Создает подписку.
+
+        Raises:
+            BroadcasterClosed: Если рассылка остановлена (приложение завершается).
+            TooManySubscribers: Если достигнут лимит подписчиков.
+        """
+        if self.closed:
+            raise BroadcasterClosed()
+        if len(self._subscribers) >= self.max_subscribers:
+            raise TooManySubscribers()
+        subscription = Subscription(self, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: dict[str, Any]) -> None:
+        """
+        Публикует событие: через мост (если он подключен) или сразу
+        подписчикам текущего процесса.
+        """
+        if self.bridge is not None:
+            self.bridge.send(event)
+        else:
+            self.deliver(event)
+
+    def deliver(self, event: dict[str, Any]) -> None:
+        """
+        Доставляет событие подписчикам текущего процесса.
+        """
+        self.published += 1
+        for subscription in list(self._subscribers):
+            subscription.put(event)
+            if subscription.overflowed:
+                self.overflows += 1
+                self.unsubscribe(subscription)
+
+    def close(self) -> None:
+        """
+        Завершает все подписки и запрещает новые (при остановке приложения).
+        """
+        self.closed = True
+        for subscription in list(self._subscribers):
+            subscription.close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+
+class PgNotifyBridge:
+    """
+    Мост между воркерами через PostgreSQL LISTEN/NOTIFY.
+
+    Использует отдельное соединение asyncpg вне пула SQLAlchemy: события
+    отправляются после фиксации транзакции записи одной фоновой задачей
+    (по порядку), а полученные уведомления доставляются подписчикам
+    текущего процесса. Событие, не помещающееся в NOTIFY, отправляется без
+    данных постов (клиент получает только операцию и ID), при необходимости
+    несколькими уведомлениями. Уведомления обрабатываются одной фоновой
+    задачей по порядку; для событий других воркеров сначала вызывается
+    `on_remote_event` (сброс кэшей), затем событие доставляется подписчикам.
+
+    Args:
+        broadcaster (Broadcaster): Рассылка, в которую доставляются события.
+        url (str): URL базы данных PostgreSQL (формат SQLAlchemy).
+        channel (str): Канал LISTEN/NOTIFY.
+        on_remote_event (Callable | None): Обработчик событий, отправленных
+            другими воркерами (собственные уведомления ему не передаются).
+    """
+
+    def __init__(
+        self,
+        broadcaster: Broadcaster,
+        url: str,
+        channel: str = "post_events",
+        on_remote_event: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ):
+        self.broadcaster = broadcaster
+        self.url = url
+        self.channel = channel
+        self.on_remote_event = on_remote_event
+        self._outgoing: asyncio.Queue[str] = asyncio.Queue()
+        self._incoming: asyncio.Queue[tuple[int, str]] = asyncio.Queue()
+        self._connection = None
+        self._server_pid: int | None = None
+        self._sender: asyncio.Task | None = None
+        self._receiver: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """
+        Открывает соединение, подписывается на канал и подключает мост к рассылке.
+        """
+        import asyncpg
+
+        dsn = make_url(self.url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._connection = await asyncpg.connect(dsn)
+        # Уведомления отправляются с этого же соединения: по его PID
+        # собственные события отличаются от событий других воркеров
+        self._server_pid = self._connection.get_server_pid()
+        await self._connection.add_listener(self.channel, self._on_notify)
+        self._sender = asyncio.create_task(self._send_loop())
+        self._receiver = asyncio.create_task(self._receive_loop())
+        self.broadcaster.bridge = self
+
+    async def stop(self) -> None:
+        """
+        Отключает мост от рассылки и закрывает соединение.
+        """
+        self.broadcaster.bridge = None
+        tasks = [task for task in (self._sender, self._receiver) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._connection is not None:
+            await self._connection.close()
+
+    def send(self, event: dict[str, Any]) -> None:
+        payload = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+        if len(payload.encode()) <= NOTIFY_PAYLOAD_LIMIT:
+            self._outgoing.put_nowait(payload)
+            return
+        ids = [{"id": item["id"]} for item in event["items"]]
+        for start in range(0, len(ids), NOTIFY_IDS_PER_PAYLOAD):
+            chunk = ids[start:start + NOTIFY_IDS_PER_PAYLOAD]
+            self._outgoing.put_nowait(json.dumps({"op": event["op"], "items": chunk}, separators=(",", ":")))
+
+    async def _send_loop(self) -> None:
+        while True:
+            payload = await self._outgoing.get()
+            try:
+                await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            except Exception:
+                logger.exception("Не удалось отправить событие через NOTIFY")
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._incoming.put_nowait((pid, payload))
+
+    async def _receive_loop(self) -> None:
+        while True:
+            pid, payload = await self._incoming.get()
+            try:
+                event = json.loads(payload)
+            except ValueError:
+                logger.warning("Некорректное уведомление в канале %s", self.channel)
+                continue
+            if self.on_remote_event is not None and pid != self._server_pid:
+                try:
+                    await self.on_remote_event(event)
+                except Exception:
+                    logger.exception("Не удалось обработать событие другого воркера")
+            self.broadcaster.deliver(event)
@@ -0,0 +1,112 @@
+"""
+Модуль с утилитами для условных HTTP-запросов (ETag / Last-Modified).
+
+Позволяет отвечать 304 Not Modified клиентам, у которых уже есть актуальная
+версия ресурса, не формируя и не сериализуя тело ответа.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def build_etag(*parts: Any) -> str:
+    """
+    Строит сильный ETag по набору значений, определяющих версию ресурса.
+
+    Args:
+        *parts (Any): Значения (например, id и временные метки записей).
+
+    Returns:
+        str: ETag в кавычках.
+    """
+    digest = hashlib.blake2b(repr(_normalize(parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _normalize(value: Any) -> Any:
+    # Даты приводятся к ISO-строке, чтобы ETag не зависел от класса tzinfo
+    # (у объектов из БД и из кэша он может различаться)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (tuple, list)):
+        return tuple(_normalize(item) for item in value)
+    return value
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite возвращает наивные datetime, которые хранятся в UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def format_http_date(value: datetime) -> str:
+    """
+    Форматирует дату для заголовка Last-Modified (RFC 9110, IMF-fixdate).
+    """
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: datetime | None = None,
+) -> bool:
+    """
+    Проверяет условные заголовки запроса.
+
+    If-None-Match имеет приоритет над If-Modified-Since (RFC 9110, 13.2.2).
+    Если `last_modified` не передан, If-Modified-Since игнорируется.
+
+    Args:
+        request (Request): Входящий запрос.
+        etag (str): Текущий ETag ресурса.
+        last_modified (datetime | None): Время последнего изменения ресурса.
+
+    Returns:
+        bool: True, если у клиента актуальная версия и можно ответить 304.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Сравнение ETag для GET — слабое: префикс W/ не учитывается
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def has_conditional_headers(request: Request) -> bool:
+    """
+    Проверяет, содержит ли запрос условные заголовки.
+    """
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def set_validators(response: Response, etag: str, last_modified: datetime | None = None) -> None:
+    """
+    Добавляет в ответ заголовки ETag и Last-Modified.
+    """
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_http_date(last_modified)
+
+
+def not_modified_response(etag: str, last_modified: datetime | None = None) -> Response:
+    """
+    Формирует пустой ответ 304 Not Modified с валидаторами.
+    """
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
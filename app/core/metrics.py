@@ -0,0 +1,294 @@
+"""
+Модуль метрик приложения в формате Prometheus.
+
+Содержит простые счетчики, гистограммы и вычисляемые показатели, хранящиеся
+в памяти процесса, ASGI-middleware для замера времени обработки запросов
+и учет запросов к БД в рамках одного HTTP-запроса. Метрики собираются
+отдельно в каждом процессе (воркере) uvicorn.
+"""
+import bisect
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограмм длительности (в секундах)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Границы корзин гистограммы количества запросов к БД за HTTP-запрос
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+# Границы корзин гистограммы размера пакетов записи
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """
+    Монотонно возрастающий счетчик с метками.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    """
+    Гистограмма распределения значений с метками.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Для каждого набора меток: [счетчики корзин..., сумма, количество]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            state[index] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return state[-1] if state else 0
+
+    def samples(self) -> Iterable[str]:
+        for labels, state in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, state):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.labelnames + ("le",), labels + (str(bound),))
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            inf_labels = _format_labels(self.labelnames + ("le",), labels + ("+Inf",))
+            yield f"{self.name}_bucket{inf_labels} {state[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {state[-2]}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {state[-1]}"
+
+
+class Gauge:
+    """
+    Показатель, значение которого вычисляется в момент сбора метрик.
+
+    Args:
+        collect (Callable): Функция, возвращающая словарь {кортеж меток: значение}.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], dict[tuple[str, ...], float]],
+        labelnames: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.collect().items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Registry:
+    """
+    Реестр метрик, формирующий ответ в текстовом формате Prometheus.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | Gauge] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def register_stats_gauge(name: str, documentation: str, stats: Callable[[], dict[str, Any]]) -> Gauge:
+    """
+    Регистрирует показатель по словарю статистики компонента (кэша, пула и т.п.):
+    каждый числовой ключ словаря — значение метки stat.
+
+    Args:
+        name (str): Имя метрики.
+        documentation (str): Описание метрики.
+        stats (Callable): Функция, возвращающая словарь статистики (например, cache.stats).
+
+    Returns:
+        Gauge: Зарегистрированный показатель.
+    """
+    return registry.register(Gauge(
+        name,
+        documentation,
+        lambda: {(key,): value for key, value in stats().items() if isinstance(value, (int, float))},
+        ("stat",),
+    ))
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "Количество HTTP-запросов", ("method", "route", "status"),
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса", ("method", "route"),
+))
+http_request_db_seconds = registry.register(Histogram(
+    "http_request_db_seconds", "Суммарное время запросов к БД за HTTP-запрос", ("method", "route"),
+))
+http_request_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "Количество запросов к БД за HTTP-запрос", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+db_query_duration_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "Время выполнения запроса к БД",
+))
+db_query_budget_exceeded_total = registry.register(Counter(
+    "db_query_budget_exceeded_total", "HTTP-запросы, превысившие бюджет запросов к БД",
+    ("method", "route"),
+))
+
+write_batch_size = registry.register(Histogram(
+    "db_write_batch_size", "Количество операций, объединенных в один пакет записи",
+    ("operation",), buckets=BATCH_SIZE_BUCKETS,
+))
+
+
+# Количество HTTP-запросов, обрабатываемых в данный момент
+_in_flight = 0
+
+registry.register(Gauge(
+    "http_requests_in_flight", "HTTP-запросы, обрабатываемые в данный момент",
+    lambda: {(): _in_flight},
+))
+
+
+@dataclass
+class QueryStats:
+    """
+    Статистика запросов к БД в рамках одного HTTP-запроса.
+    """
+    count: int = 0
+    seconds: float = 0.0
+    budget: int | None = None  # Допустимое количество запросов (см. app.core.query_budget)
+
+
+# Статистика запросов к БД текущего HTTP-запроса (None вне запроса)
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def record_query(duration: float) -> None:
+    """
+    Учитывает выполненный запрос к БД в общих метриках и в статистике
+    текущего HTTP-запроса.
+
+    Args:
+        duration (float): Время выполнения запроса в секундах.
+    """
+    db_query_duration_seconds.observe(duration)
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += duration
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware, замеряющее время обработки HTTP-запросов.
+
+    Метрики группируются по шаблону маршрута (например,
+    /api/v1/posts/{post_id}), а не по фактическому пути, чтобы количество
+    рядов не зависело от идентификаторов в URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _in_flight -= 1
+            duration = time.perf_counter() - start
+            current_query_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path_format", None) or "unmatched"
+            method = scope["method"]
+            http_requests_total.inc(method, route_path, str(status_code))
+            http_request_duration_seconds.observe(duration, method, route_path)
+            http_request_db_seconds.observe(stats.seconds, method, route_path)
+            http_request_db_queries.observe(stats.count, method, route_path)
+            if stats.budget is not None and stats.count > stats.budget:
+                db_query_budget_exceeded_total.inc(method, route_path)
+                logger.warning(
+                    "%s %s: %d запросов к БД при бюджете %d",
+                    method, route_path, stats.count, stats.budget,
+                )
@@ -0,0 +1,162 @@
+"""
+Модуль с утилитами для курсорной (keyset) пагинации.
+
+Курсор — непрозрачная для клиента строка, которая кодирует позицию последней
+выданной записи в порядке сортировки: (created_at, id) для списка постов или
+(rank, id) для результатов поиска. В отличие от OFFSET, запрос по курсору
+не сканирует пропущенные строки, поэтому стоимость любой страницы одинакова.
+"""
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any
+
+
+class InvalidCursorError(ValueError):
+    """
+    Исключение, возникающее при попытке декодировать некорректный курсор.
+    """
+
+
+# Допустимые значения ID поста (INTEGER) и номера изменения (BIGINT) в БД
+MAX_POST_ID = 2**31 - 1
+MAX_CHANGE_SEQ = 2**63 - 1
+
+# Ошибки разбора данных курсора: OverflowError — например, int(float("inf"))
+# для числа 1e400 в JSON
+_DECODE_ERRORS = (ValueError, TypeError, OverflowError)
+
+
+def _encode(values: list[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list[Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded))
+    if not isinstance(values, list):
+        raise TypeError("Курсор должен кодировать список")
+    return values
+
+
+def _bounded_int(value: Any, maximum: int) -> int:
+    """
+    Преобразует значение курсора в целое число из диапазона [0, maximum],
+    чтобы оно не переполнило параметр запроса к БД.
+    """
+    number = int(value)
+    if not 0 <= number <= maximum:
+        raise ValueError("Значение курсора вне допустимого диапазона")
+    return number
+
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    """
+    Кодирует позицию записи в курсор.
+
+    Args:
+        created_at (datetime): Время создания последней выданной записи.
+        post_id (int): ID последней выданной записи.
+
+    Returns:
+        str: Курсор в виде base64url-строки без паддинга.
+    """
+    return _encode([created_at.isoformat(), post_id])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Декодирует курсор, полученный от клиента.
+
+    Args:
+        cursor (str): Курсор, ранее выданный API.
+
+    Returns:
+        tuple[datetime, int]: Пара (created_at, id) последней выданной записи.
+
+    Raises:
+        InvalidCursorError: Если курсор поврежден или имеет неверный формат.
+    """
+    try:
+        created_at, post_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), _bounded_int(post_id, MAX_POST_ID)
+    except _DECODE_ERRORS as e:
+        raise InvalidCursorError("Некорректный курсор") from e
+
+
+def encode_rank_cursor(rank: float, post_id: int) -> str:
+    """
+    Кодирует позицию результата поиска в курсор.
+
+    Args:
+        rank (float): Релевантность последней выданной записи.
+        post_id (int): ID последней выданной записи.
+
+    Returns:
+        str: Курсор в виде base64url-строки без паддинга.
+    """
+    return _encode([rank, post_id])
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Декодирует курсор результатов поиска.
+
+    Args:
+        cursor (str): Курсор, ранее выданный API.
+
+    Returns:
+        tuple[float, int]: Пара (rank, id) последней выданной записи.
+
+    Raises:
+        InvalidCursorError: Если курсор поврежден или имеет неверный формат.
+    """
+    try:
+        rank, post_id = _decode(cursor)
+        rank = float(rank)
+        if not math.isfinite(rank):
+            raise ValueError("Релевантность должна быть конечным числом")
+        return rank, _bounded_int(post_id, MAX_POST_ID)
+    except _DECODE_ERRORS as e:
+        raise InvalidCursorError("Некорректный курсор") from e
+
+
+def encode_change_token(position: tuple[int, int]) -> str:
+    """
+    Кодирует позицию в ленте изменений постов в токен.
+
+    Args:
+        position (tuple[int, int]): ID транзакции и номер последнего выданного изменения.
+
+    Returns:
+        str: Токен в виде base64url-строки без паддинга.
+    """
+    return _encode(list(position))
+
+
+def decode_change_token(token: str) -> tuple[int, int]:
+    """
+    Декодирует токен ленты изменений.
+
+    Токены прежнего формата (только номер изменения) читаются как позиция
+    с нулевым ID транзакции: лента будет выдана повторно, но без пропусков.
+
+    Args:
+        token (str): Токен, ранее выданный API.
+
+    Returns:
+        tuple[int, int]: ID транзакции и номер последнего выданного изменения.
+
+    Raises:
+        InvalidCursorError: Если токен поврежден или имеет неверный формат.
+    """
+    try:
+        values = _decode(token)
+        if len(values) == 1:
+            values = [0, *values]
+        change_xid, change_seq = values
+        return _bounded_int(change_xid, MAX_CHANGE_SEQ), _bounded_int(change_seq, MAX_CHANGE_SEQ)
+    except _DECODE_ERRORS as e:
+        raise InvalidCursorError("Некорректный токен") from e
@@ -0,0 +1,93 @@
+"""
+Модуль бюджетов запросов к базе данных.
+
+Эндпоинт объявляет, сколько запросов к БД (обращений к курсору) ему допустимо
+выполнить за один HTTP-запрос. Превышение бюджета учитывается в метрике
+db_query_budget_exceeded_total, а при QUERY_BUDGET_ENFORCE=True запрос,
+выходящий за бюджет, завершается ошибкой — так регрессии с лишними обращениями
+к БД обнаруживаются тестами.
+
+Пример:
+    @router.get("/{post_id}", dependencies=[Depends(query_budget(1))])
+"""
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import current_query_stats
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """
+    Исключение, возникающее при превышении бюджета запросов к БД
+    (только при QUERY_BUDGET_ENFORCE=True).
+    """
+
+
+def query_budget(max_queries: int) -> Callable[[], None]:
+    """
+    Создает зависимость FastAPI, объявляющую бюджет запросов к БД эндпоинта.
+
+    Args:
+        max_queries (int): Максимальное количество запросов к БД за HTTP-запрос.
+
+    Returns:
+        Callable[[], None]: Зависимость для параметра `dependencies` маршрута.
+    """
+    async def declare_budget() -> None:
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+
+    declare_budget.max_queries = max_queries
+    return declare_budget
+
+
+def check_query_budget(statement: str) -> None:
+    """
+    Проверяет, не выходит ли очередной запрос за бюджет текущего HTTP-запроса.
+
+    Вызывается перед выполнением каждого запроса к БД.
+
+    Args:
+        statement (str): SQL-запрос, который собираются выполнить.
+
+    Raises:
+        QueryBudgetExceeded: Если бюджет исчерпан и включен QUERY_BUDGET_ENFORCE.
+    """
+    if not settings.QUERY_BUDGET_ENFORCE:
+        return
+    stats = current_query_stats.get()
+    if stats is not None and stats.budget is not None and stats.count >= stats.budget:
+        raise QueryBudgetExceeded(
+            f"Превышен бюджет запросов к БД ({stats.budget}): {statement}"
+        )
+
+
+@contextmanager
+def capture_queries() -> Iterator[list[str]]:
+    """
+    Собирает SQL-запросы, выполненные основным движком внутри блока `with`.
+
+    Пример:
+        with capture_queries() as queries:
+            await client.get("/api/v1/posts/1")
+        assert len(queries) == 1
+
+    Yields:
+        list[str]: Список выполненных SQL-запросов (пополняется по ходу блока).
+    """
+    from app.core.database import engine
+
+    queries: list[str] = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(engine.sync_engine, "after_cursor_execute", collect)
+    try:
+        yield queries
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", collect)
@@ -0,0 +1,120 @@
+"""
+Модуль маршрутизации чтения на реплики базы данных.
+
+Содержит выбор реплики для очередного чтения (по кругу или по наименьшему
+количеству активных сессий) и механизм read-your-writes: после успешного
+изменяющего запроса клиент получает cookie, и в течение
+READ_YOUR_WRITES_SECONDS его чтения выполняются на основной БД, чтобы
+он сразу видел свои изменения, даже если реплика отстает.
+"""
+import itertools
+import time
+from typing import Generic, Literal, Sequence, TypeVar
+
+from starlette.requests import HTTPConnection
+
+T = TypeVar("T")
+
+# Cookie с моментом (unix-время), до которого чтения клиента идут на основную БД
+PRIMARY_UNTIL_COOKIE = "primary_until"
+
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class ReplicaRouter(Generic[T]):
+    """
+    Выбирает реплику для очередного чтения.
+
+    Args:
+        replicas (Sequence[T]): Реплики (например, движки SQLAlchemy).
+        strategy (str): "round_robin" — по кругу, "least_connections" — реплика
+            с наименьшим количеством сессий, выданных через acquire и еще не
+            возвращенных через release (в рамках текущего процесса).
+    """
+
+    def __init__(self, replicas: Sequence[T], strategy: Literal["round_robin", "least_connections"] = "round_robin"):
+        if not replicas:
+            raise ValueError("Нужна хотя бы одна реплика")
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self._cycle = itertools.cycle(range(len(self.replicas)))
+        self._active = [0] * len(self.replicas)
+
+    def acquire(self) -> T:
+        """
+        Выбирает реплику и учитывает ее как занятую.
+
+        Returns:
+            T: Выбранная реплика. После использования ее нужно вернуть через release.
+        """
+        if self.strategy == "least_connections":
+            index = min(range(len(self.replicas)), key=self._active.__getitem__)
+        else:
+            index = next(self._cycle)
+        self._active[index] += 1
+        return self.replicas[index]
+
+    def release(self, replica: T) -> None:
+        """
+        Возвращает реплику, выданную acquire.
+        """
+        self._active[self.replicas.index(replica)] -= 1
+
+    def active(self) -> list[int]:
+        """
+        Количество выданных и не возвращенных сессий по каждой реплике.
+        """
+        return list(self._active)
+
+
+def prefers_primary(connection: HTTPConnection) -> bool:
+    """
+    Проверяет, должен ли клиент читать с основной БД (read-your-writes).
+
+    Args:
+        connection (HTTPConnection): Входящий запрос.
+
+    Returns:
+        bool: True, если клиент недавно выполнял изменяющий запрос.
+    """
+    value = connection.cookies.get(PRIMARY_UNTIL_COOKIE)
+    if value is None:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI-middleware, закрепляющее чтения клиента за основной БД после записи.
+
+    На успешный (статус < 400) POST/PUT/PATCH/DELETE добавляет в ответ cookie
+    PRIMARY_UNTIL_COOKIE на `seconds` секунд. Cookie хранится у клиента,
+    поэтому закрепление работает при нескольких воркерах и экземплярах приложения.
+
+    Args:
+        seconds (float): Время закрепления за основной БД.
+    """
+
+    def __init__(self, app, seconds: float):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS or self.seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.seconds
+                cookie = (
+                    f"{PRIMARY_UNTIL_COOKIE}={until:.3f}; Max-Age={int(self.seconds) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
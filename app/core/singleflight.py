@@ -0,0 +1,119 @@
+"""
+Модуль объединения одинаковых конкурентных чтений (single-flight).
+
+Когда много запросов одновременно читают одно и то же (популярный пост,
+первая страница списка), только первый из них (ведущий) выполняет запрос
+к БД, а остальные ждут и получают его результат. Так всплеск одинаковых
+запросов занимает одно соединение пула вместо сотни. Дополнительно результат
+может храниться очень короткое время (micro-cache), чтобы объединялись и
+запросы, пришедшие сразу после завершения чтения.
+
+Это не долговременный кэш: результат разделяется только между запросами,
+пересекающимися по времени (плюс TTL микро-кэша).
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+R = TypeVar("R")
+
+
+class _LeaderCancelled(Exception):
+    """
+    Ведущий запрос отменен (например, клиент отключился): ожидающие
+    повторяют чтение сами, а не получают чужую отмену.
+    """
+
+
+class SingleFlight:
+    """
+    Объединяет одинаковые конкурентные вызовы по ключу.
+
+    Результат передается всем ожидающим как есть, поэтому вызывающие
+    не должны его изменять. Ошибка ведущего передается ожидающим.
+
+    Args:
+        ttl (float): Время хранения результата после завершения чтения
+            в секундах (0 — только объединение одновременных вызовов).
+        maxsize (int): Максимальное количество результатов в микро-кэше.
+    """
+
+    def __init__(self, ttl: float = 0.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._recent: dict[Hashable, tuple[float, Any]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.recent_hits = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[R]]) -> R:
+        """
+        Выполняет `fn` или присоединяется к уже выполняющемуся вызову с тем же ключом.
+
+        Args:
+            key (Hashable): Ключ чтения; вызовы с равными ключами объединяются.
+            fn (Callable): Функция чтения.
+
+        Returns:
+            R: Результат чтения (общий для объединенных вызовов).
+        """
+        while True:
+            recent = self._recent.get(key)
+            if recent is not None:
+                if recent[0] > time.monotonic():
+                    self.recent_hits += 1
+                    return recent[1]
+                del self._recent[key]
+
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        self.leaders += 1
+        future = asyncio.get_running_loop().create_future()
+        # Ошибка без ожидающих не должна попадать в лог как необработанная
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._in_flight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            raise
+        finally:
+            del self._in_flight[key]
+
+        future.set_result(result)
+        if self.ttl > 0:
+            self._remember(key, result)
+        return result
+
+    def _remember(self, key: Hashable, result: Any) -> None:
+        now = time.monotonic()
+        if len(self._recent) >= self.maxsize:
+            self._recent = {k: v for k, v in self._recent.items() if v[0] > now}
+            while len(self._recent) >= self.maxsize:
+                del self._recent[next(iter(self._recent))]
+        self._recent[key] = (now + self.ttl, result)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Статистика объединения: ведущие вызовы, объединенные вызовы,
+        ответы из микро-кэша и доля вызовов, не дошедших до БД.
+        """
+        total = self.leaders + self.coalesced + self.recent_hits
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "recent_hits": self.recent_hits,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": (self.coalesced + self.recent_hits) / total if total else 0.0,
+        }
@@ -0,0 +1,143 @@
+"""
+Модуль журнала медленных запросов к базе данных.
+
+Запросы дольше SLOW_QUERY_THRESHOLD_MS записываются в лог с параметрами,
+длительностью и вызвавшим их методом слоя CRUD (например, CRUDPost.get_posts)
+и сохраняются в ограниченном кольцевом буфере. Для доли медленных запросов
+(SLOW_QUERY_EXPLAIN_SAMPLE_RATE) в PostgreSQL в фоне снимается план
+выполнения EXPLAIN, чтобы находить отсутствующие индексы и неудачные планы
+без подключения профилировщика к работающему воркеру.
+"""
+import asyncio
+import contextvars
+import logging
+import random
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+import greenlet
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Префикс модулей, методы которых указываются как источник запроса
+CALLER_MODULE_PREFIX = "app.crud"
+# Максимальная длина записи параметров запроса
+MAX_PARAMETERS_LENGTH = 500
+# Ожидание блокировок при снятии плана (исходная транзакция может их еще держать)
+EXPLAIN_LOCK_TIMEOUT = "1s"
+
+# Признак выполнения EXPLAIN, чтобы запросы самого EXPLAIN не попадали в журнал
+_explaining: contextvars.ContextVar[bool] = contextvars.ContextVar("slow_query_explaining", default=False)
+
+
+def find_caller() -> str | None:
+    """
+    Находит метод слоя CRUD, из которого выполняется текущий запрос к БД.
+
+    Асинхронный SQLAlchemy выполняет запрос в отдельном greenlet, поэтому
+    после его стека просматривается стек родительского greenlet, где
+    находятся корутины вызывающего кода.
+
+    Returns:
+        str | None: Имя метода (например, "CRUDPost.get_post") или None.
+    """
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent()
+    while True:
+        while frame is not None:
+            if frame.f_globals.get("__name__", "").startswith(CALLER_MODULE_PREFIX):
+                return frame.f_code.co_qualname
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return None
+        frame = current.gr_frame
+
+
+class SlowQueryLog:
+    """
+    Журнал медленных запросов с кольцевым буфером последних записей.
+
+    Args:
+        threshold_ms (float): Порог длительности в миллисекундах (< 0 — журнал отключен).
+        explain_sample_rate (float): Доля медленных запросов, для которых снимается план (0..1).
+        maxlen (int): Размер кольцевого буфера.
+    """
+
+    def __init__(self, threshold_ms: float, explain_sample_rate: float, maxlen: int):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.entries: deque[dict[str, Any]] = deque(maxlen=maxlen)
+        self._tasks: set[asyncio.Task] = set()
+
+    def observe(self, conn, statement: str, parameters: Any, duration: float) -> None:
+        """
+        Учитывает выполненный запрос; вызывается из события after_cursor_execute.
+
+        Args:
+            conn: Соединение SQLAlchemy (синхронное), выполнившее запрос.
+            statement (str): SQL-запрос.
+            parameters (Any): Параметры запроса.
+            duration (float): Длительность в секундах.
+        """
+        duration_ms = duration * 1000
+        if self.threshold_ms < 0 or duration_ms < self.threshold_ms or _explaining.get():
+            return
+
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "caller": find_caller(),
+            "statement": statement,
+            "parameters": repr(parameters)[:MAX_PARAMETERS_LENGTH],
+            "plan": None,
+        }
+        self.entries.append(entry)
+        logger.warning(
+            "Медленный запрос %.1f мс (%s): %s; параметры: %s",
+            duration_ms, entry["caller"], statement, entry["parameters"],
+        )
+
+        if (
+            conn.dialect.name == "postgresql"
+            and self.explain_sample_rate > 0
+            and random.random() < self.explain_sample_rate
+        ):
+            # План снимается в фоне на отдельном соединении из пула, независимо
+            # от исходной транзакции: она может быть еще не завершена, поэтому
+            # ее незафиксированные изменения плану не видны, а ожидание ее
+            # блокировок ограничено EXPLAIN_LOCK_TIMEOUT
+            task = asyncio.get_running_loop().create_task(
+                self._explain(AsyncEngine(conn.engine), statement, parameters, entry),
+                context=contextvars.Context(),
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, engine: AsyncEngine, statement: str, parameters: Any, entry: dict[str, Any]) -> None:
+        """
+        Снимает план запроса. SELECT выполняется с EXPLAIN (ANALYZE, BUFFERS);
+        изменяющие запросы — только EXPLAIN, без повторного выполнения.
+        Транзакция всегда откатывается; ожидание блокировок ограничено
+        EXPLAIN_LOCK_TIMEOUT.
+        """
+        _explaining.set(True)
+        is_select = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if is_select else "EXPLAIN "
+        start = time.perf_counter()
+        try:
+            async with engine.connect() as connection:
+                await connection.exec_driver_sql(f"SET LOCAL lock_timeout = '{EXPLAIN_LOCK_TIMEOUT}'")
+                result = await connection.exec_driver_sql(prefix + statement, parameters)
+                entry["plan"] = "\n".join(row[0] for row in result)
+                await connection.rollback()
+        except Exception as error:
+            entry["plan"] = f"Не удалось получить план: {error}"
+        entry["explain_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def clear(self) -> None:
+        self.entries.clear()
@@ -4,22 +4,159 @@
 с моделью Post в базе данных.
 """
 
+import re
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Sequence
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
+from sqlalchemy import DateTime, Integer, any_, insert, literal, update, delete, tuple_, func, literal_column, column, table, text
+from sqlalchemy.dialects.postgresql import ARRAY
 
-from app.models.post import Post
-from app.schemas.post import PostCreate, PostUpdate
+from app.core.batching import MicroBatcher
+from app.core.cache import CacheBackend, PrefixCache, create_post_cache, create_title_prefix_cache
+from app.core.events import Broadcaster
+from app.core.singleflight import SingleFlight
+from app.core.config import settings
+from app.core.database import PRIMARY_PINNED_SESSION, REPLICA_SESSION, async_session
+from app.core.metrics import register_stats_gauge
+from app.models.post import Post, PostActivityRollup, PostCounter, PostTombstone, activity_bucket_sql
+from app.schemas.post import POST_SUMMARY_FIELDS, PostCreate, PostUpdate, PostInDB
 
 class CRUDPost:
     """
     Класс, инкапсулирующий CRUD-операции для модели Post.
+
+    Args:
+        cache (CacheBackend | None): Кэш для чтения постов по ID. Если None,
+            чтение всегда идет в базу данных.
+        coalesce_creates (bool): Объединять конкурентные вызовы create_post
+            в пакеты (один многострочный INSERT в одной транзакции).
+        batch_window (float): Окно сбора пакета создания в секундах.
+        batch_max (int): Максимальный размер пакета создания.
+        events (Broadcaster | None): Рассылка событий о созданиях, изменениях
+            и удалениях постов (после фиксации транзакции).
+        title_cache (PrefixCache | None): Кэш автодополнения заголовков. Если
+            None, каждый запрос подсказок идет в базу данных.
+        reads (SingleFlight | None): Объединение одинаковых конкурентных чтений
+            поста по ID и страниц списка. Если None, каждое чтение выполняет
+            свой запрос.
     """
 
+    def __init__(
+        self,
+        cache: CacheBackend | None = None,
+        coalesce_creates: bool = False,
+        batch_window: float = 0.005,
+        batch_max: int = 100,
+        events: Broadcaster | None = None,
+        title_cache: PrefixCache | None = None,
+        reads: SingleFlight | None = None,
+    ):
+        self.cache = cache
+        self.events = events
+        self.title_cache = title_cache
+        self.reads = reads
+        # Счетчик записей входит в ключ объединения чтений: чтение, начатое
+        # после записи, не присоединяется к чтению, начатому до нее.
+        self._writes = 0
+        # Счетчик инвалидаций: читатель не сохраняет в кэш результат запроса,
+        # если за время запроса пост мог быть изменен другим запросом.
+        self._invalidations = 0
+        self.create_batcher: MicroBatcher[PostCreate, Post] | None = (
+            MicroBatcher(self._flush_creates, max_size=batch_max, window=batch_window, name="post_create")
+            if coalesce_creates else None
+        )
+
+    async def _invalidate(self, post_id: int) -> None:
+        """
+        Удаляет пост из кэша после его изменения или удаления.
+
+        Args:
+            post_id (int): Идентификатор поста.
+        """
+        self._invalidations += 1
+        if self.cache is not None:
+            await self.cache.delete(post_id)
+
+    def _after_write(self, op: str, posts: Sequence[Post]) -> None:
+        """
+        Учитывает зафиксированную запись: обновляет кэш автодополнения
+        заголовков и публикует события.
+
+        Args:
+            op (str): Операция: "create", "update" или "delete".
+            posts (Sequence[Post]): Затронутые посты.
+        """
+        self._writes += 1
+        if self.title_cache is not None:
+            for post in posts:
+                self.title_cache.invalidate(post.id, None if op == "delete" else post.title)
+        self._publish(op, posts)
+
+    async def apply_remote_write(self, event: dict[str, Any]) -> None:
+        """
+        Учитывает запись, сделанную другим воркером (событие из PgNotifyBridge):
+        удаляет затронутые посты из кэша постов и кэша автодополнения.
+
+        Args:
+            event (dict): Событие операции записи ({"op": ..., "items": [...]}).
+        """
+        self._writes += 1
+        for item in event["items"]:
+            await self._invalidate(item["id"])
+            if self.title_cache is None:
+                continue
+            if "post" in item:
+                self.title_cache.invalidate(item["id"], item["post"]["title"])
+            elif event["op"] == "delete":
+                self.title_cache.invalidate(item["id"], None)
+            else:
+                # Событие без данных поста (не поместилось в NOTIFY): заголовок неизвестен
+                self.title_cache.clear()
+
+    async def _read(self, db: AsyncSession, key: tuple, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполняет чтение через объединение одинаковых конкурентных чтений.
+
+        Ключ дополняется движком сессии (основная БД или реплика) и счетчиком
+        записей, поэтому объединяются только чтения из одного источника,
+        между которыми не было записи в этом процессе.
+        """
+        if self.reads is None:
+            return await fn()
+        return await self.reads.do((db.bind, self._writes) + key, fn)
+
+    def _publish(self, op: str, posts: Sequence[Post]) -> None:
+        """
+        Публикует событие об изменении постов, если на них кто-то подписан.
+
+        Одна операция записи (в том числе массовая) — одно событие со списком
+        постов в `items`, поэтому размер операции не переполняет очереди
+        подписчиков.
+
+        Args:
+            op (str): Операция: "create", "update" или "delete".
+            posts (Sequence[Post]): Затронутые посты.
+        """
+        if self.events is None or not self.events.active or not posts:
+            return
+        items = []
+        for post in posts:
+            item: dict[str, Any] = {"id": post.id}
+            if op != "delete":
+                item["post"] = PostInDB.model_validate(post, from_attributes=True).model_dump(mode="json")
+            items.append(item)
+        self.events.publish({"op": op, "items": items})
+
     async def create_post(self, db: AsyncSession, post_in: PostCreate) -> Post:
         """
         Создает новый пост в базе данных.
 
+        Если включена группировка созданий, пост добавляется в текущий пакет
+        и создается вместе с другими конкурентными вызовами в собственной
+        сессии пакета; переданная сессия `db` при этом не используется.
+
         Args:
             db (AsyncSession): Асинхронная сессия базы данных.
             post_in (PostCreate): Схема Pydantic с данными для создания поста.
@@ -27,13 +164,77 @@ class CRUDPost:
         Returns:
             Post: Созданный объект Post из базы данных.
         """
-        db_post = Post(**post_in.model_dump()) # model_dump() для Pydantic v2
-        # db_post = Post(**post_in.dict()) # для Pydantic v1
-        db.add(db_post)
+        if self.create_batcher is not None:
+            return await self.create_batcher.submit(post_in)
+        # INSERT ... RETURNING: id и timestamps возвращаются тем же запросом,
+        # без отдельного SELECT для refresh
+        result = await db.scalars(
+            insert(Post).values(**post_in.model_dump()).returning(Post) # model_dump() для Pydantic v2
+        )
+        db_post = result.one()
         await db.commit() # Сохраняем изменения в БД
-        await db.refresh(db_post) # Обновляем объект из БД, чтобы получить id и timestamps
+        self._after_write("create", [db_post])
         return db_post
 
+    async def create_posts(self, db: AsyncSession, posts_in: list[PostCreate]) -> list[Post]:
+        """
+        Создает несколько постов одним многострочным INSERT ... RETURNING
+        в одной транзакции.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            posts_in (list[PostCreate]): Схемы Pydantic с данными для создания постов.
+
+        Returns:
+            list[Post]: Созданные объекты Post в том же порядке, что и входные данные.
+        """
+        if not posts_in:
+            return []
+        # В SQLite упорядочивание RETURNING по входным параметрам вынуждает
+        # SQLAlchemy вставлять строки по одной, поэтому там порядок
+        # восстанавливается по id: SQLite выдает rowid в порядке VALUES.
+        is_sqlite = db.bind.dialect.name == "sqlite"
+        result = await db.scalars(
+            insert(Post).returning(Post, sort_by_parameter_order=not is_sqlite),
+            [post_in.model_dump() for post_in in posts_in],
+        )
+        posts = result.all()
+        if is_sqlite:
+            posts.sort(key=lambda post: post.id)
+        await db.commit()
+        self._after_write("create", posts)
+        return posts
+
+    async def _flush_creates(self, posts_in: list[PostCreate]) -> list[Post | Exception]:
+        """
+        Создает пакет постов, собранный create_post, одной транзакцией.
+
+        Если пакет не удалось вставить целиком (например, из-за нарушения
+        ограничения в одной из строк), посты создаются по одному, и ошибка
+        достается только вызывающему с некорректными данными.
+
+        Args:
+            posts_in (list[PostCreate]): Данные постов пакета.
+
+        Returns:
+            list[Post | Exception]: Созданный пост или ошибка для каждого элемента.
+        """
+        try:
+            async with async_session() as session:
+                return await self.create_posts(session, posts_in)
+        except Exception:
+            if len(posts_in) == 1:
+                raise
+
+        results: list[Post | Exception] = []
+        for post_in in posts_in:
+            try:
+                async with async_session() as session:
+                    results.extend(await self.create_posts(session, [post_in]))
+            except Exception as error:
+                results.append(error)
+        return results
+
     async def get_post(self, db: AsyncSession, post_id: int) -> Post | None:
         """
         Получает пост по его идентификатору.
@@ -50,22 +251,523 @@ class CRUDPost:
         )
         return result.scalar_one_or_none()
 
-    async def get_posts(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Post]:
+    async def get_post_cached(self, db: AsyncSession, post_id: int) -> PostInDB | None:
         """
-        Получает список постов с пагинацией.
+        Получает пост по идентификатору через кэш (read-through).
+
+        При промахе пост читается из базы данных и сохраняется в кэш в виде
+        схемы PostInDB, не привязанной к сессии. Одновременные промахи по
+        одному посту выполняют один запрос к БД.
+
+        Кэш заполняется только с основной БД: отстающая реплика могла бы
+        вернуть в кэш версию, уже замененную записью. Клиент, закрепленный
+        за основной БД после записи (read-your-writes), читает мимо кэша.
 
         Args:
             db (AsyncSession): Асинхронная сессия базы данных.
-            skip (int): Количество пропускаемых записей.
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            PostInDB | None: Данные поста, если найден, иначе None.
+        """
+        if self.cache is not None and not db.info.get(PRIMARY_PINNED_SESSION):
+            cached = await self.cache.get(post_id)
+            if cached is not None:
+                return cached
+
+        async def load() -> PostInDB | None:
+            invalidations = self._invalidations
+            post = await self.get_post(db, post_id)
+            if post is None:
+                return None
+            post_data = PostInDB.model_validate(post, from_attributes=True)
+            if (
+                self.cache is not None
+                and invalidations == self._invalidations
+                and not db.info.get(REPLICA_SESSION)
+            ):
+                await self.cache.set(post_id, post_data)
+            return post_data
+
+        return await self._read(db, ("post", post_id), load)
+
+    async def get_post_version(
+        self, db: AsyncSession, post_id: int
+    ) -> tuple[datetime, datetime | None] | None:
+        """
+        Получает временные метки поста без загрузки его содержимого.
+
+        Если пост есть в кэше, запрос к базе данных не выполняется (кроме
+        клиента, закрепленного за основной БД после записи).
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            post_id (int): Идентификатор поста.
+
+        Returns:
+            tuple[datetime, datetime | None] | None: Пара (created_at, updated_at),
+            если пост найден, иначе None.
+        """
+        if self.cache is not None and not db.info.get(PRIMARY_PINNED_SESSION):
+            cached = await self.cache.get(post_id)
+            if cached is not None:
+                return cached.created_at, cached.updated_at
+
+        result = await db.execute(
+            select(Post.created_at, Post.updated_at).where(Post.id == post_id)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+
+    async def get_posts(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[Post]:
+        """
+        Получает список постов с пагинацией, от новых к старым.
+
+        Если передан `after`, используется курсорная (keyset) пагинация:
+        выбираются записи, идущие строго после позиции (created_at, id) в порядке
+        сортировки, а `skip` игнорируется. Такой запрос обслуживается индексом
+        ix_posts_created_at_id и не зависит от глубины страницы.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            skip (int): Количество пропускаемых записей (устаревший режим OFFSET).
             limit (int): Максимальное количество возвращаемых записей.
+            after (tuple[datetime, int] | None): Позиция (created_at, id) последней выданной записи.
 
         Returns:
             list[Post]: Список объектов Post.
         """
+        result = await db.execute(self._page_query(select(Post), skip, limit, after))
+        return result.scalars().all()
+
+    async def get_posts_rows(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after: tuple[datetime, int] | None = None,
+        fields: Sequence[str] | None = None,
+        excerpt_length: int = 200,
+    ) -> list[dict[str, Any]]:
+        """
+        Получает ту же страницу, что и get_posts, в виде словарей вместо ORM-объектов.
+
+        Выбираются только столбцы из `fields` (и всегда id, created_at,
+        updated_at, нужные для курсора и ETag), поэтому без поля content
+        длинные тексты не читаются из БД и не передаются по сети. Поле
+        excerpt вычисляется в БД как первые `excerpt_length` символов content.
+
+        По умолчанию столбцы выбираются в порядке полей PostInDB, чтобы строки
+        можно было сериализовать адаптером post_rows_adapter без промежуточных моделей.
+
+        Одновременные запросы одной и той же страницы выполняют один запрос
+        к БД и получают общий список, который нельзя изменять.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            skip (int): Количество пропускаемых записей (устаревший режим OFFSET).
+            limit (int): Максимальное количество возвращаемых записей.
+            after (tuple[datetime, int] | None): Позиция (created_at, id) последней выданной записи.
+            fields (Sequence[str] | None): Поля из POST_LIST_FIELDS; None — все поля PostInDB.
+            excerpt_length (int): Длина отрывка для поля excerpt.
+
+        Returns:
+            list[dict[str, Any]]: Список постов в виде словарей.
+        """
+        async def load() -> list[dict[str, Any]]:
+            columns = self._row_columns(fields, excerpt_length)
+            result = await db.execute(self._page_query(select(*columns), skip, limit, after))
+            return [row._asdict() for row in result]
+
+        key = ("page", skip, limit, after, tuple(fields) if fields is not None else None, excerpt_length)
+        return await self._read(db, key, load)
+
+    async def get_posts_rows_by_ids(
+        self,
+        db: AsyncSession,
+        ids: Sequence[int],
+        fields: Sequence[str] | None = None,
+        excerpt_length: int = 200,
+    ) -> list[dict[str, Any]]:
+        """
+        Получает посты с указанными идентификаторами одним запросом.
+
+        Столбцы выбираются так же, как в get_posts_rows.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            ids (Sequence[int]): Идентификаторы постов.
+            fields (Sequence[str] | None): Поля из POST_LIST_FIELDS; None — все поля PostInDB.
+            excerpt_length (int): Длина отрывка для поля excerpt.
+
+        Returns:
+            list[dict[str, Any]]: Найденные посты в порядке `ids`.
+        """
+        columns = self._row_columns(fields, excerpt_length)
+        result = await db.execute(select(*columns).where(self._ids_filter(db, ids)))
+        rows = {row.id: row._asdict() for row in result}
+        return [rows[post_id] for post_id in ids if post_id in rows]
+
+    @staticmethod
+    def _row_columns(fields: Sequence[str] | None, excerpt_length: int) -> list:
+        """
+        Столбцы для выборки постов в виде словарей: запрошенные поля
+        и всегда id, created_at, updated_at.
+        """
+        names = list(fields if fields is not None else PostInDB.model_fields)
+        names += [name for name in ("id", "created_at", "updated_at") if name not in names]
+        return [
+            func.substr(Post.content, 1, excerpt_length).label("excerpt")
+            if name == "excerpt" else getattr(Post, name)
+            for name in names
+        ]
+
+    @staticmethod
+    def _ids_filter(db: AsyncSession, ids: Sequence[int]):
+        """
+        Условие "id входит в список".
+
+        В PostgreSQL список передается одним параметром-массивом
+        (id = ANY(:ids)), поэтому текст запроса и подготовленное выражение
+        не зависят от количества id. В остальных СУБД — IN (...).
+        """
+        if db.bind.dialect.name == "postgresql":
+            return Post.id == any_(literal(list(ids), ARRAY(Integer)))
+        return Post.id.in_(list(ids))
+
+    async def get_posts_versions(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[tuple[int, datetime, datetime | None]]:
+        """
+        Получает версии постов той же страницы, что и get_posts, без загрузки
+        содержимого: только id и временные метки.
+
+        Используется для проверки условных запросов (ETag) к списку постов.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            skip (int): Количество пропускаемых записей (устаревший режим OFFSET).
+            limit (int): Максимальное количество возвращаемых записей.
+            after (tuple[datetime, int] | None): Позиция (created_at, id) последней выданной записи.
+
+        Returns:
+            list[tuple[int, datetime, datetime | None]]: Кортежи (id, created_at, updated_at).
+        """
+        stmt = select(Post.id, Post.created_at, Post.updated_at)
+        result = await db.execute(self._page_query(stmt, skip, limit, after))
+        return [tuple(row) for row in result.all()]
+
+    async def count_posts(self, db: AsyncSession, exact: bool = False) -> int:
+        """
+        Возвращает общее количество постов.
+
+        По умолчанию значение — сумма COUNTER_SLOTS строк таблицы post_counters,
+        которые поддерживают триггеры БД при вставке и удалении постов:
+        стоимость не зависит от размера таблицы. Точный подсчет COUNT(*) выполняется
+        только по запросу и требует полного прохода по индексу.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            exact (bool): Выполнить COUNT(*) по таблице posts.
+
+        Returns:
+            int: Количество постов.
+        """
+        if exact:
+            stmt = select(func.count()).select_from(Post)
+        else:
+            stmt = select(func.sum(PostCounter.total))
+        # sum(bigint) в PostgreSQL имеет тип numeric
+        return int((await db.execute(stmt)).scalar_one_or_none() or 0)
+
+    async def get_change_watermark(self, db: AsyncSession) -> int | None:
+        """
+        Получает границу видимости ленты изменений: xmin текущего снимка.
+
+        Все транзакции с ID меньше границы завершены, поэтому их изменения
+        уже видны и позже не появятся. Транзакции с большими ID могут
+        зафиксироваться позже с меньшими номерами изменений, поэтому лента
+        их не выдает, пока граница не пройдет их. Запрашивается до чтения
+        изменений: следующие выражения видят все транзакции ниже границы.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+
+        Returns:
+            int | None: ID транзакции или None, если граница не нужна (SQLite:
+            единственный писатель, транзакции фиксируются в порядке номеров).
+        """
+        if db.bind.dialect.name != "postgresql":
+            return None
+        return await db.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
+
+    async def get_changes(
+        self,
+        db: AsyncSession,
+        since: tuple[int, int] = (0, 0),
+        limit: int = 100,
+        watermark: int | None = None,
+    ) -> list[tuple[tuple[int, int], str, Post | int]]:
+        """
+        Получает изменения постов после позиции `since` в порядке позиций.
+
+        Позиция изменения — пара (ID транзакции, номер изменения). Созданные
+        и измененные посты берутся из posts по индексу ix_posts_change_xid_seq
+        (пост, измененный несколько раз, выдается один раз в актуальном
+        состоянии), удаленные — из post_tombstones. Стоимость зависит от
+        количества изменений, а не от размера таблицы.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            since (tuple[int, int]): Позиция последнего изменения, уже полученного клиентом.
+            limit (int): Максимальное количество возвращаемых изменений.
+            watermark (int | None): Граница видимости из get_change_watermark;
+                изменения транзакций с ID не меньше нее не выдаются.
+
+        Returns:
+            list[tuple[tuple[int, int], str, Post | int]]: Тройки (позиция, "upsert", пост)
+            или (позиция, "delete", ID поста).
+        """
+        post_stmt = select(Post).where(tuple_(Post.change_xid, Post.change_seq) > since)
+        tombstone_stmt = select(
+            PostTombstone.change_xid, PostTombstone.change_seq, PostTombstone.post_id
+        ).where(tuple_(PostTombstone.change_xid, PostTombstone.change_seq) > since)
+        if watermark is not None:
+            post_stmt = post_stmt.where(Post.change_xid < watermark)
+            tombstone_stmt = tombstone_stmt.where(PostTombstone.change_xid < watermark)
+
+        posts = await db.scalars(
+            post_stmt.order_by(Post.change_xid, Post.change_seq).limit(limit)
+        )
+        tombstones = await db.execute(
+            tombstone_stmt.order_by(PostTombstone.change_xid, PostTombstone.change_seq).limit(limit)
+        )
+        changes = [((post.change_xid, post.change_seq), "upsert", post) for post in posts]
+        changes += [((change_xid, change_seq), "delete", post_id) for change_xid, change_seq, post_id in tombstones]
+        changes.sort(key=lambda change: change[0])
+        return changes[:limit]
+
+    async def suggest_titles(self, db: AsyncSession, prefix: str, limit: int = 10) -> list[tuple[int, str]]:
+        """
+        Подсказывает заголовки постов, начинающиеся с префикса (без учета регистра).
+
+        Результаты упорядочены по заголовку и выбираются диапазонным
+        сканированием индекса ix_posts_title_prefix. Перед базой данных
+        стоит кэш по префиксу, который поддерживают операции записи; как и
+        кэш постов, он не заполняется с реплик и не используется для
+        клиента, закрепленного за основной БД после записи.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            prefix (str): Начало заголовка.
+            limit (int): Максимальное количество подсказок.
+
+        Returns:
+            list[tuple[int, str]]: Пары (ID поста, заголовок).
+        """
+        prefix = prefix.lower()
+        use_cache = self.title_cache is not None and not db.info.get(PRIMARY_PINNED_SESSION)
+        if use_cache:
+            cached = self.title_cache.get(prefix, limit)
+            if cached is not None:
+                return cached
+            generation = self.title_cache.generation
+
+        if db.bind.dialect.name == "postgresql":
+            key = func.lower(Post.title).collate("C")
+            pattern = re.sub(r"([\\%_])", r"\\\1", prefix) + "%"
+            condition = key.like(pattern, escape="\\")
+        else:
+            # Диапазон [префикс, префикс + максимальный символ) по индексу lower(title);
+            # строки сравниваются побайтно (UTF-8), поэтому в него попадают все продолжения префикса
+            key = func.lower(Post.title)
+            condition = (key >= prefix) & (key < prefix + "\U0010ffff")
         result = await db.execute(
-            select(Post).offset(skip).limit(limit)
+            select(Post.id, Post.title).where(condition).order_by(key, Post.id).limit(limit)
         )
-        return result.scalars().all()
+        suggestions = [tuple(row) for row in result]
+        if use_cache and not db.info.get(REPLICA_SESSION):
+            self.title_cache.set(prefix, limit, suggestions, generation)
+        return suggestions
+
+    async def get_activity_stats(
+        self,
+        db: AsyncSession,
+        granularity: str,
+        start: datetime,
+        end: datetime,
+    ) -> list[tuple[datetime, int, int]]:
+        """
+        Получает активность по часам или дням из сводки post_activity_rollups.
+
+        Почасовые строки сводки читаются по первичному ключу; для дней они
+        группируются в БД. Стоимость зависит от длины интервала, а не от
+        количества постов. Интервалы без постов не возвращаются.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            granularity (str): "hour" или "day".
+            start (datetime): Начало интервала (включительно).
+            end (datetime): Конец интервала (не включительно).
+
+        Returns:
+            list[tuple[datetime, int, int]]: Тройки (начало интервала в UTC,
+            количество постов, суммарная длина содержимого) по возрастанию времени.
+        """
+        if granularity == "hour":
+            bucket = PostActivityRollup.bucket
+        else:
+            bucket = literal_column(
+                activity_bucket_sql(db.bind.dialect.name, "post_activity_rollups.bucket", granularity),
+                DateTime(timezone=True),
+            )
+        posts = func.sum(PostActivityRollup.post_count)
+        stmt = (
+            select(bucket.label("bucket"), posts, func.sum(PostActivityRollup.content_length))
+            .where(
+                PostActivityRollup.bucket >= start.astimezone(timezone.utc),
+                PostActivityRollup.bucket < end.astimezone(timezone.utc),
+            )
+            .group_by(bucket)
+            .having(posts > 0)
+            .order_by(bucket)
+        )
+        result = await db.execute(stmt)
+        # SQLite возвращает время без часового пояса; сводка всегда в UTC
+        return [
+            (bucket_start if bucket_start.tzinfo else bucket_start.replace(tzinfo=timezone.utc), int(count), int(length))
+            for bucket_start, count, length in result
+        ]
+
+    async def rebuild_activity_rollups(self, db: AsyncSession) -> int:
+        """
+        Пересчитывает сводку активности по всей таблице постов (backfill).
+
+        В PostgreSQL на время пересчета таблица posts блокируется от записи
+        (чтение не блокируется), чтобы триггеры конкурентных транзакций
+        не изменили сводку между очисткой и заполнением.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+
+        Returns:
+            int: Количество строк (часов) в сводке.
+        """
+        dialect = db.bind.dialect.name
+        if dialect == "postgresql":
+            await db.execute(text("LOCK TABLE posts IN SHARE MODE"))
+        await db.execute(delete(PostActivityRollup).execution_options(synchronize_session=False))
+        bucket = literal_column(activity_bucket_sql(dialect, "posts.created_at"))
+        result = await db.execute(
+            insert(PostActivityRollup).from_select(
+                ["bucket", "post_count", "content_length"],
+                select(bucket, func.count(), func.sum(func.length(Post.content))).group_by(bucket),
+            )
+        )
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def _page_query(stmt, skip: int, limit: int, after: tuple[datetime, int] | None):
+        """
+        Добавляет к запросу сортировку и пагинацию списка постов.
+        """
+        stmt = stmt.order_by(Post.created_at.desc(), Post.id.desc())
+        if after is not None:
+            stmt = stmt.where(tuple_(Post.created_at, Post.id) < after)
+        else:
+            stmt = stmt.offset(skip)
+        return stmt.limit(limit)
+
+    async def search_posts(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 20,
+        after: tuple[float, int] | None = None,
+    ) -> list[tuple[Post, float]]:
+        """
+        Выполняет полнотекстовый поиск по заголовку и содержимому постов.
+
+        Результаты отсортированы по убыванию релевантности (при равной
+        релевантности — по убыванию id) и поддерживают курсорную пагинацию
+        по паре (rank, id).
+
+        В PostgreSQL используется столбец search_vector с GIN-индексом и
+        ts_rank, в SQLite — FTS5-таблица posts_fts и bm25.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            query (str): Поисковый запрос.
+            limit (int): Максимальное количество возвращаемых записей.
+            after (tuple[float, int] | None): Позиция (rank, id) последней выданной записи.
+
+        Returns:
+            list[tuple[Post, float]]: Найденные посты и их релевантность.
+        """
+        if db.bind.dialect.name == "postgresql":
+            search_vector = literal_column("posts.search_vector")
+            ts_query = func.websearch_to_tsquery(
+                literal_column(f"'{settings.SEARCH_TS_CONFIG}'"), query
+            )
+            rank = func.ts_rank(search_vector, ts_query)
+            stmt = select(Post, rank.label("rank")).where(search_vector.op("@@")(ts_query))
+        else:
+            # Экранируем каждое слово, чтобы пользовательский ввод не разбирался
+            # как синтаксис запросов FTS5; слова объединяются через AND.
+            terms = re.findall(r"\w+", query)
+            if not terms:
+                return []
+            fts_query = " ".join(f'"{term}"' for term in terms)
+            posts_fts = table("posts_fts", column("rowid"), column("rank"))
+            # bm25 в FTS5 тем меньше, чем выше релевантность
+            rank = -posts_fts.c.rank
+            stmt = (
+                select(Post, rank.label("rank"))
+                .join(posts_fts, posts_fts.c.rowid == Post.id)
+                .where(literal_column("posts_fts").op("MATCH")(fts_query))
+            )
+
+        if after is not None:
+            stmt = stmt.where(tuple_(rank, Post.id) < after)
+        stmt = stmt.order_by(rank.desc(), Post.id.desc()).limit(limit)
+        result = await db.execute(stmt)
+        return [(post, float(post_rank)) for post, post_rank in result.all()]
+
+    async def stream_posts(
+        self, db: AsyncSession, fetch_size: int
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Потоково выгружает все посты, порциями по `fetch_size` строк.
+
+        Используется серверный курсор, поэтому в памяти одновременно находится
+        не более одной порции строк независимо от размера таблицы.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            fetch_size (int): Количество строк, получаемых из курсора за раз.
+
+        Yields:
+            list[dict[str, Any]]: Очередная порция постов в виде словарей.
+        """
+        stmt = (
+            select(Post.id, Post.title, Post.content, Post.created_at, Post.updated_at)
+            .order_by(Post.id)
+            .execution_options(yield_per=fetch_size)
+        )
+        result = await db.stream(stmt)
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
 
     async def update_post(self, db: AsyncSession, post_id: int, post_in: PostUpdate) -> Post | None:
         """
@@ -86,8 +788,69 @@ class CRUDPost:
             .returning(Post) # Возвращает обновленный объект (для PG 9.5+)
         )
         result = await db.execute(stmt)
+        updated_post = result.scalar_one_or_none()
         await db.commit()
-        return result.scalar_one_or_none()
+        await self._invalidate(post_id)
+        if updated_post is not None:
+            self._after_write("update", [updated_post])
+        return updated_post
+
+    async def update_posts(
+        self, db: AsyncSession, post_ids: Sequence[int], post_in: PostUpdate
+    ) -> list[Post]:
+        """
+        Применяет одни и те же изменения к нескольким постам одним
+        UPDATE ... RETURNING в одной транзакции.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            post_ids (Sequence[int]): Идентификаторы постов.
+            post_in (PostUpdate): Изменения (только переданные поля).
+
+        Returns:
+            list[Post]: Обновленные посты в порядке `post_ids`; отсутствующие
+            посты пропускаются.
+        """
+        stmt = (
+            update(Post)
+            .where(self._ids_filter(db, post_ids))
+            .values(**post_in.model_dump(exclude_unset=True))
+            .returning(Post)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        updated = {post.id: post for post in result.scalars()}
+        await db.commit()
+        for post_id in updated:
+            await self._invalidate(post_id)
+        self._after_write("update", list(updated.values()))
+        return [updated[post_id] for post_id in post_ids if post_id in updated]
+
+    async def delete_posts(self, db: AsyncSession, post_ids: Sequence[int]) -> list[Post]:
+        """
+        Удаляет несколько постов одним DELETE ... RETURNING в одной транзакции.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            post_ids (Sequence[int]): Идентификаторы постов.
+
+        Returns:
+            list[Post]: Удаленные посты в порядке `post_ids`; отсутствующие
+            посты пропускаются.
+        """
+        stmt = (
+            delete(Post)
+            .where(self._ids_filter(db, post_ids))
+            .returning(Post)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        deleted = {post.id: post for post in result.scalars()}
+        await db.commit()
+        for post_id in deleted:
+            await self._invalidate(post_id)
+        self._after_write("delete", list(deleted.values()))
+        return [deleted[post_id] for post_id in post_ids if post_id in deleted]
 
     async def delete_post(self, db: AsyncSession, post_id: int) -> Post | None:
         """
@@ -100,14 +863,70 @@ class CRUDPost:
         Returns:
             Post | None: Удаленный объект Post, если найден, иначе None.
         """
-        # Сначала получаем объект, чтобы вернуть его после удаления
-        post_to_delete = await self.get_post(db, post_id)
-        if not post_to_delete:
-            return None
-
-        stmt = delete(Post).where(Post.id == post_id)
-        await db.execute(stmt)
+        # DELETE ... RETURNING возвращает удаленную строку тем же запросом
+        stmt = delete(Post).where(Post.id == post_id).returning(Post)
+        result = await db.execute(stmt)
+        deleted_post = result.scalar_one_or_none()
         await db.commit()
-        return post_to_delete
+        if deleted_post is not None:
+            await self._invalidate(post_id)
+            self._after_write("delete", [deleted_post])
+        return deleted_post
+
+    async def warm_up(self, db: AsyncSession, read_only: bool = False) -> None:
+        """
+        Выполняет частые запросы с параметрами, не находящими записей.
+
+        SQLAlchemy сохраняет скомпилированные выражения в кэше движка,
+        а asyncpg — подготовленные выражения в кэше соединения, поэтому
+        первые запросы после запуска не тратят время на компиляцию.
+        Кэш постов не используется и не изменяется.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия базы данных.
+            read_only (bool): Только чтения (для реплик: hot standby отклоняет
+                изменяющие выражения даже в откатываемой транзакции).
+        """
+        after = (datetime.now(), 0)
+        await self.get_post(db, -1)
+        await db.execute(select(Post.created_at, Post.updated_at).where(Post.id == -1))
+        for cursor in (None, after):
+            await self.get_posts_versions(db, limit=0, after=cursor)
+            for fields in (None, POST_SUMMARY_FIELDS):
+                await self.get_posts_rows(
+                    db, limit=0, after=cursor, fields=fields, excerpt_length=settings.POST_EXCERPT_LENGTH
+                )
+        await self.count_posts(db)
+        if read_only:
+            return
+        # Изменяющие выражения — в транзакции, которая откатывается
+        await db.execute(delete(Post).where(Post.id == -1).returning(Post))
+        await db.rollback()
+
+post_crud = CRUDPost(
+    cache=create_post_cache(),
+    coalesce_creates=settings.POST_CREATE_COALESCE,
+    batch_window=settings.POST_CREATE_BATCH_WINDOW,
+    batch_max=settings.POST_CREATE_BATCH_MAX,
+    events=Broadcaster(
+        max_subscribers=settings.POST_EVENTS_MAX_SUBSCRIBERS,
+        queue_size=settings.POST_EVENTS_QUEUE_SIZE,
+    ),
+    title_cache=create_title_prefix_cache(),
+    reads=SingleFlight(ttl=settings.SINGLE_FLIGHT_TTL) if settings.SINGLE_FLIGHT_ENABLED else None,
+) # Создаем экземпляр класса для удобного импорта
+
+if post_crud.cache is not None:
+    register_stats_gauge("post_cache", "Статистика кэша постов", post_crud.cache.stats)
+
+if post_crud.title_cache is not None:
+    register_stats_gauge(
+        "post_title_suggest_cache", "Статистика кэша автодополнения заголовков", post_crud.title_cache.stats
+    )
+
+if post_crud.reads is not None:
+    register_stats_gauge(
+        "post_single_flight", "Статистика объединения одинаковых конкурентных чтений постов", post_crud.reads.stats
+    )
 
-post_crud = CRUDPost() # Создаем экземпляр класса для удобного импорта
\ No newline at end of file
+register_stats_gauge("post_events", "Статистика рассылки событий постов", post_crud.events.stats)
\ No newline at end of file
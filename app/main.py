@@ -5,28 +5,146 @@
 """
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from markupsafe import Markup
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.api import api_router
-from app.core.database import engine, Base # Импортируем engine и Base для создания таблиц при запуске (только для dev)
+from app.core.database import (
+    DATABASE_URL,
+    Base,
+    dispose_engines,
+    engine,
+    get_read_db,
+    replica_engines,
+    warm_up_engine,
+)
+from app.core.events import PgNotifyBridge
+from app.core.http_cache import build_etag
+from app.core.metrics import MetricsMiddleware, register_stats_gauge, registry
+from app.core.pagination import encode_cursor
+from app.core.query_budget import query_budget
+from app.crud.post import post_crud
+from app.schemas.post import POST_SUMMARY_FIELDS
+from app.core.replicas import ReadYourWritesMiddleware
+import asyncio
+import functools
+import logging
 import os
+import signal
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _on_shutdown_signal(callback) -> None:
+    """
+    Вызывает `callback` в цикле событий при получении SIGINT/SIGTERM,
+    сохраняя обработчики сервера.
+
+    Uvicorn по сигналу перестает принимать соединения и ждет завершения
+    открытых, и только потом выполняет остановку lifespan. Бесконечные ответы
+    (потоки событий) нужно завершить раньше — по самому сигналу, иначе
+    остановка зависнет. Обработчики uvicorn восстанавливаются им самим
+    после остановки.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(callback)
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Подготовка приложения к работе и корректная остановка.
+
+    При запуске: создание таблиц (только DEV и DB_CREATE_ALL_ON_STARTUP),
+    прогрев пулов соединений и кэшей скомпилированных выражений, подключение
+    моста событий и сброса кэшей между воркерами (POST_EVENTS_PG_NOTIFY).
+    Потоки событий завершаются по сигналу остановки, до того как сервер
+    начнет ждать открытые соединения. Время ожидания остальных запросов
+    ограничивается сервером (uvicorn --timeout-graceful-shutdown).
+    При остановке lifespan: отправка накопленного пакета создания постов,
+    отключение моста событий и закрытие соединений с БД.
+    """
+    if settings.MODE == "DEV" and settings.DB_CREATE_ALL_ON_STARTUP:
+        # В продакшене таблицами управляют миграции
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        logger.info("Таблицы БД проверены/созданы.")
+
+    if settings.DB_WARMUP_CONNECTIONS > 0:
+        await warm_up_engine(engine, settings.DB_WARMUP_CONNECTIONS, post_crud.warm_up)
+        # Реплики (hot standby) принимают только чтение
+        for target in replica_engines:
+            await warm_up_engine(
+                target, settings.DB_WARMUP_CONNECTIONS, functools.partial(post_crud.warm_up, read_only=True)
+            )
+        logger.info("Пулы соединений прогреты: %d соединений.", settings.DB_WARMUP_CONNECTIONS)
+
+    bridge = None
+    if settings.POST_EVENTS_PG_NOTIFY:
+        bridge = PgNotifyBridge(post_crud.events, DATABASE_URL, on_remote_event=post_crud.apply_remote_write)
+        await bridge.start()
+
+    _on_shutdown_signal(post_crud.events.close)
+
+    yield
+
+    post_crud.events.close()
+    if post_crud.create_batcher is not None:
+        await post_crud.create_batcher.close()
+    if bridge is not None:
+        await bridge.stop()
+    await dispose_engines()
 
 # Инициализируем FastAPI приложение
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs", # URL для Swagger UI
-    redoc_url="/redoc" # URL для ReDoc
+    redoc_url="/redoc", # URL для ReDoc
+    lifespan=lifespan,
 )
 
+# Замер времени обработки запросов и запросов к БД (метрики доступны на /metrics)
+app.add_middleware(MetricsMiddleware)
+# После записи чтения клиента временно идут в основную БД, а не на реплики
+app.add_middleware(ReadYourWritesMiddleware, seconds=settings.READ_YOUR_WRITES_SECONDS)
+
 # Монтируем статические файлы (если есть)
 # app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # Настраиваем Jinja2 шаблоны
-templates = Jinja2Templates(directory="app/templates")
+# Скомпилированные шаблоны кэшируются в памяти процесса, а их байткод — на диске,
+# чтобы новые воркеры не компилировали шаблоны заново. Проверка изменения
+# файлов шаблонов при каждом рендеринге нужна только при разработке.
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader("app/templates"),
+    autoescape=True,
+    bytecode_cache=FileSystemBytecodeCache(settings.TEMPLATE_BYTECODE_CACHE_DIR),
+    auto_reload=settings.MODE == "DEV",
+))
+
+# Кэш отрендеренных фрагментов списка постов главной страницы.
+# Ключ — ETag версий постов страницы, поэтому любая запись (в том числе
+# в другом воркере) дает новый ключ, а устаревшие фрагменты вытесняются.
+fragment_cache = LRUCache(maxsize=settings.FRAGMENT_CACHE_MAXSIZE, ttl=settings.FRAGMENT_CACHE_TTL)
+register_stats_gauge("fragment_cache", "Статистика кэша фрагментов главной страницы", fragment_cache.stats)
 
 # Включаем API-мартеры
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -47,16 +165,58 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 #     print("Таблицы БД проверены/созданы.")
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print("Таблицы БД проверены/созданы.")
-    yield
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """
+    Отдает метрики приложения в текстовом формате Prometheus.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+async def render_posts_fragment(db: AsyncSession) -> str:
+    """
+    Рендерит список первых постов для главной страницы через кэш фрагментов.
+
+    Версии постов страницы (id и временные метки) читаются легким запросом;
+    посты загружаются и шаблон рендерится только при промахе кэша.
+
+    Args:
+        db (AsyncSession): Сессия базы данных.
 
-@app.get("/", response_class=HTMLResponse)
-async def read_root_frontend(request: Request):
+    Returns:
+        str: HTML-фрагмент списка постов.
+    """
+    limit = settings.FRONTEND_PAGE_SIZE
+    versions = await post_crud.get_posts_versions(db=db, limit=limit + 1)
+    key = build_etag("posts_fragment", *versions)
+    fragment = await fragment_cache.get(key)
+    if fragment is not None:
+        return fragment
+
+    rows = await post_crud.get_posts_rows(
+        db=db,
+        limit=limit + 1,
+        fields=POST_SUMMARY_FIELDS,
+        excerpt_length=settings.POST_EXCERPT_LENGTH,
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if rows else None
+    fragment = templates.get_template("_posts_list.html").render(posts=rows, next_cursor=next_cursor)
+    await fragment_cache.set(key, fragment)
+    return fragment
+
+@app.get("/", response_class=HTMLResponse, dependencies=[Depends(query_budget(2))])
+async def read_root_frontend(request: Request, db: AsyncSession = Depends(get_read_db)):
     """
     Корневой эндпоинт для отображения главной страницы фронтенда.
+
+    Первая страница постов рендерится на сервере, поэтому браузеру не нужен
+    дополнительный запрос к API, чтобы показать посты.
     """
-    return templates.TemplateResponse("index.html", {"request": request, "project_name": settings.PROJECT_NAME})
\ No newline at end of file
+    posts_html = Markup(await render_posts_fragment(db))
+    return templates.TemplateResponse(
+        request,
+        "index.html",
+        {"project_name": settings.PROJECT_NAME, "posts_html": posts_html},
+    )
\ No newline at end of file
@@ -3,8 +3,11 @@
 Модуль, определяющий модель данных Post для SQLAlchemy ORM.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime
+import re
+
+from sqlalchemy import BigInteger, Column, Integer, String, Text, DateTime, Index, DDL, event
 from sqlalchemy.sql import func
+from app.core.config import settings
 from app.core.database import Base
 
 class Post(Base):
@@ -18,9 +21,432 @@ class Post(Base):
     content = Column(Text, nullable=False) # Содержимое поста, может быть длинным текстом
     created_at = Column(DateTime(timezone=True), server_default=func.now()) # Время создания, автоматически заполняется при создании
     updated_at = Column(DateTime(timezone=True), onupdate=func.now()) # Время последнего обновления, автоматически обновляется
+    change_seq = Column(BigInteger) # Номер последнего изменения (ленты изменений), заполняется триггером БД
+    change_xid = Column(BigInteger, nullable=False, server_default="0") # ID транзакции изменения (PostgreSQL; в SQLite 0)
+
+    __table_args__ = (
+        # Составной индекс для курсорной пагинации по (created_at, id)
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        # Позиция в ленте изменений
+        Index("ix_posts_change_xid_seq", "change_xid", "change_seq"),
+    )
 
     def __repr__(self):
         """
         Представление объекта Post для отладки.
         """
-        return f"<Post(id={self.id}, title='{self.title}')>"
\ No newline at end of file
+        return f"<Post(id={self.id}, title='{self.title}')>"
+
+
+class PostCounter(Base):
+    """
+    Модель PostCounter — счетчик постов, разделенный на COUNTER_SLOTS строк
+    (id от 1 до COUNTER_SLOTS); общее количество — сумма total по всем строкам.
+    Поддерживается триггерами БД в той же транзакции, что и запись в posts,
+    поэтому чтение общего количества постов не зависит от размера таблицы,
+    а конкурентные записи обновляют разные строки и не ждут друг друга.
+    """
+    __tablename__ = "post_counters"
+
+    id = Column(Integer, primary_key=True) # Номер строки счетчика
+    total = Column(BigInteger, nullable=False, default=0) # Вклад строки в количество постов (может быть отрицательным)
+    change_seq = Column(BigInteger, nullable=False, server_default="0") # Последний выданный номер изменения (только SQLite)
+
+
+class PostTombstone(Base):
+    """
+    Модель PostTombstone — запись об удалении поста для ленты изменений.
+    Создается триггером БД при удалении поста.
+    """
+    __tablename__ = "post_tombstones"
+
+    change_seq = Column(BigInteger, primary_key=True, autoincrement=False) # Номер изменения
+    change_xid = Column(BigInteger, nullable=False, server_default="0") # ID транзакции удаления (PostgreSQL; в SQLite 0)
+    post_id = Column(Integer, nullable=False) # ID удаленного поста
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now()) # Время удаления
+
+    __table_args__ = (
+        Index("ix_post_tombstones_change_xid_seq", "change_xid", "change_seq"),
+    )
+
+
+class PostActivityRollup(Base):
+    """
+    Модель PostActivityRollup — почасовая сводка активности: количество
+    постов и суммарная длина их содержимого по часу создания (UTC).
+    Поддерживается триггерами БД в той же транзакции, что и запись в posts,
+    поэтому статистика по часам и дням читается из сотен строк сводки
+    вместо GROUP BY по всей таблице постов.
+    """
+    __tablename__ = "post_activity_rollups"
+
+    bucket = Column(DateTime(timezone=True), primary_key=True) # Начало часа (UTC)
+    post_count = Column(BigInteger, nullable=False, default=0) # Количество постов, созданных за час
+    content_length = Column(BigInteger, nullable=False, default=0) # Суммарная длина content в символах
+
+
+def activity_bucket_sql(dialect: str, column: str, unit: str = "hour") -> str:
+    """
+    SQL-выражение начала часа или дня (UTC) для столбца времени.
+
+    В SQLite результат имеет формат хранения DateTime в SQLAlchemy, чтобы
+    строковые сравнения с параметрами-датами давали правильный порядок.
+
+    Args:
+        dialect (str): Диалект БД ("postgresql" или "sqlite").
+        column (str): Столбец или выражение со временем.
+        unit (str): "hour" или "day".
+
+    Returns:
+        str: SQL-выражение.
+    """
+    if dialect == "postgresql":
+        return f"date_trunc('{unit}', {column} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+    time_format = "%H:00:00" if unit == "hour" else "00:00:00"
+    return f"strftime('%Y-%m-%d {time_format}.000000', {column})"
+
+
+# Полнотекстовый поиск.
+# PostgreSQL: хранимый генерируемый столбец search_vector (tsvector) с GIN-индексом,
+# БД сама пересчитывает его при INSERT и UPDATE. Столбец не отображается в модели,
+# чтобы не загружать его в обычных запросах.
+# SQLite (локальная замена PostgreSQL): внешняя FTS5-таблица posts_fts,
+# синхронизируемая триггерами.
+if not re.fullmatch(r"\w+", settings.SEARCH_TS_CONFIG):
+    raise ValueError("SEARCH_TS_CONFIG должен быть именем конфигурации текстового поиска")
+
+SEARCH_DDL = {
+    "postgresql": [
+        f"""
+        ALTER TABLE posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('{settings.SEARCH_TS_CONFIG}', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{settings.SEARCH_TS_CONFIG}', coalesce(content, '')), 'B')
+        ) STORED
+        """,
+        "CREATE INDEX ix_posts_search_vector ON posts USING gin (search_vector)",
+    ],
+    "sqlite": [
+        """
+        CREATE VIRTUAL TABLE posts_fts USING fts5(
+            title, content, content='posts', content_rowid='id', tokenize='unicode61'
+        )
+        """,
+        """
+        CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+        """,
+    ],
+}
+
+
+
+def _listen_ddl(target, event_name: str, ddl_by_dialect: dict[str, list[str]]) -> None:
+    """
+    Регистрирует DDL-выражения для выполнения при создании/удалении таблицы
+    в зависимости от диалекта БД.
+    """
+    for dialect, statements in ddl_by_dialect.items():
+        for statement in statements:
+            event.listen(target, event_name, DDL(statement).execute_if(dialect=dialect))
+
+
+_listen_ddl(Post.__table__, "after_create", SEARCH_DDL)
+
+event.listen(
+    Post.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite"),
+)
+
+
+# Автодополнение заголовков: регистронезависимый поиск по префиксу.
+# PostgreSQL: индекс по lower(title) с сортировкой "C" — как text_pattern_ops
+# обслуживает LIKE 'префикс%' диапазонным сканированием, а кроме того выдает
+# строки в порядке ORDER BY lower(title) COLLATE "C", без сортировки всех совпадений.
+# SQLite: индекс по lower(title) (lower() подменяется на соединениях
+# приложения, см. app.core.database) и диапазонное условие вместо LIKE:
+# оптимизатор SQLite применяет LIKE к индексу только по столбцу, а NOCASE
+# не учитывает регистр только для ASCII.
+TITLE_PREFIX_DDL = {
+    "postgresql": ['CREATE INDEX ix_posts_title_prefix ON posts (lower(title) COLLATE "C")'],
+    "sqlite": ["CREATE INDEX ix_posts_title_prefix ON posts (lower(title))"],
+}
+
+_listen_ddl(Post.__table__, "after_create", TITLE_PREFIX_DDL)
+
+
+# Счетчик постов.
+# PostgreSQL: триггеры уровня выражения с таблицами переходов — один UPDATE
+# счетчика на INSERT/DELETE независимо от количества строк (важно для
+# массовой вставки). Строка счетчика выбирается по PID серверного процесса:
+# транзакции на разных соединениях обновляют разные строки и не блокируют
+# друг друга до фиксации. SQLite (один писатель): построчные триггеры, строка 1.
+COUNTER_SLOTS = 16
+
+COUNTER_DDL = {
+    "postgresql": [
+        f"""
+        CREATE OR REPLACE FUNCTION post_counters_on_insert() RETURNS trigger AS $$
+        BEGIN
+            UPDATE post_counters SET total = total + (SELECT count(*) FROM new_rows)
+            WHERE id = pg_backend_pid() % {COUNTER_SLOTS} + 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE OR REPLACE FUNCTION post_counters_on_delete() RETURNS trigger AS $$
+        BEGIN
+            UPDATE post_counters SET total = total - (SELECT count(*) FROM old_rows)
+            WHERE id = pg_backend_pid() % {COUNTER_SLOTS} + 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER posts_count_insert AFTER INSERT ON posts
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION post_counters_on_insert()
+        """,
+        """
+        CREATE TRIGGER posts_count_delete AFTER DELETE ON posts
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION post_counters_on_delete()
+        """,
+    ],
+    "sqlite": [
+        """
+        CREATE TRIGGER posts_count_insert AFTER INSERT ON posts BEGIN
+            UPDATE post_counters SET total = total + 1 WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER posts_count_delete AFTER DELETE ON posts BEGIN
+            UPDATE post_counters SET total = total - 1 WHERE id = 1;
+        END
+        """,
+    ],
+}
+
+_listen_ddl(Post.__table__, "after_create", COUNTER_DDL)
+
+# Таблица счетчиков создается после posts: строка 1 инициализируется текущим
+# количеством постов (на случай, если posts уже содержит данные), остальные — нулем.
+PostCounter.__table__.add_is_dependent_on(Post.__table__)
+event.listen(
+    PostCounter.__table__,
+    "after_create",
+    DDL("INSERT INTO post_counters (id, total) SELECT 1, count(*) FROM posts"),
+)
+event.listen(
+    PostCounter.__table__,
+    "after_create",
+    DDL(
+        "INSERT INTO post_counters (id, total) VALUES "
+        + ", ".join(f"({slot}, 0)" for slot in range(2, COUNTER_SLOTS + 1))
+    ),
+)
+
+
+# Лента изменений.
+# Позиция изменения — пара (change_xid, change_seq).
+# PostgreSQL: номер выдается последовательностью post_change_seq (без
+# блокировок: конкурентные записи не ждут друг друга), change_xid — ID
+# транзакции записи. Транзакции фиксируются не в порядке номеров, поэтому
+# лента выдает только изменения транзакций с ID меньше xmin снимка чтения
+# (все они уже завершены) и продвигает токен до xmin — изменение, которое
+# будет зафиксировано позже, имеет ID транзакции не меньше xmin и не будет
+# пропущено. Удаления записываются в post_tombstones триггером уровня
+# выражения.
+# SQLite (один писатель, транзакции фиксируются по порядку): номера из
+# счетчика post_counters.change_seq (строка 1), change_xid всегда 0.
+CHANGE_FEED_DDL = {
+    "postgresql": [
+        "CREATE SEQUENCE IF NOT EXISTS post_change_seq",
+        """
+        CREATE OR REPLACE FUNCTION posts_set_change_seq() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_seq := nextval('post_change_seq');
+            NEW.change_xid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION posts_record_tombstones() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO post_tombstones (change_seq, change_xid, post_id)
+            SELECT nextval('post_change_seq'), pg_current_xact_id()::text::bigint, id FROM old_rows;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER posts_change_seq BEFORE INSERT OR UPDATE OF title, content ON posts
+        FOR EACH ROW EXECUTE FUNCTION posts_set_change_seq()
+        """,
+        """
+        CREATE TRIGGER posts_tombstone AFTER DELETE ON posts
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION posts_record_tombstones()
+        """,
+    ],
+    "sqlite": [
+        """
+        CREATE TRIGGER posts_change_seq_ai AFTER INSERT ON posts BEGIN
+            UPDATE post_counters SET change_seq = change_seq + 1 WHERE id = 1;
+            UPDATE posts SET change_seq = (SELECT change_seq FROM post_counters WHERE id = 1)
+            WHERE id = new.id;
+        END
+        """,
+        """
+        CREATE TRIGGER posts_change_seq_au AFTER UPDATE OF title, content ON posts BEGIN
+            UPDATE post_counters SET change_seq = change_seq + 1 WHERE id = 1;
+            UPDATE posts SET change_seq = (SELECT change_seq FROM post_counters WHERE id = 1)
+            WHERE id = new.id;
+        END
+        """,
+        """
+        CREATE TRIGGER posts_tombstone_ad AFTER DELETE ON posts BEGIN
+            UPDATE post_counters SET change_seq = change_seq + 1 WHERE id = 1;
+            INSERT INTO post_tombstones (change_seq, post_id)
+            SELECT change_seq, old.id FROM post_counters WHERE id = 1;
+        END
+        """,
+    ],
+}
+
+_listen_ddl(Post.__table__, "after_create", CHANGE_FEED_DDL)
+PostTombstone.__table__.add_is_dependent_on(Post.__table__)
+event.listen(
+    Post.__table__,
+    "after_drop",
+    DDL("DROP SEQUENCE IF EXISTS post_change_seq").execute_if(dialect="postgresql"),
+)
+
+
+# Сводка активности.
+# PostgreSQL: триггеры уровня выражения с таблицами переходов — изменение
+# каждого затронутого часа одним UPSERT на выражение (изменение UPDATE —
+# разность новых и старых строк; выражения, не менявшие content и created_at,
+# сводку не трогают). SQLite: построчные триггеры.
+def _rollup_upsert(delta: str) -> str:
+    return f"""
+        INSERT INTO post_activity_rollups (bucket, post_count, content_length)
+        SELECT bucket, sum(posts), sum(chars) FROM ({delta}) AS delta
+        GROUP BY bucket
+        HAVING sum(posts) <> 0 OR sum(chars) <> 0
+        ON CONFLICT (bucket) DO UPDATE SET
+            post_count = post_activity_rollups.post_count + EXCLUDED.post_count,
+            content_length = post_activity_rollups.content_length + EXCLUDED.content_length
+    """
+
+
+def _rollup_delta(rows: str, sign: str) -> str:
+    bucket = activity_bucket_sql("postgresql", "created_at")
+    return f"SELECT {bucket} AS bucket, {sign}1 AS posts, {sign}length(content) AS chars FROM {rows}"
+
+
+def _sqlite_rollup_add(row: str, sign: str) -> str:
+    # Символ % удваивается: текст DDL проходит через форматирование SQLAlchemy
+    bucket = activity_bucket_sql("sqlite", f"{row}.created_at").replace("%", "%%")
+    return f"""
+            INSERT INTO post_activity_rollups (bucket, post_count, content_length)
+            VALUES ({bucket}, {sign}1, {sign}length({row}.content))
+            ON CONFLICT (bucket) DO UPDATE SET
+                post_count = post_count + excluded.post_count,
+                content_length = content_length + excluded.content_length;
+    """
+
+
+ROLLUP_DDL = {
+    "postgresql": [
+        f"""
+        CREATE OR REPLACE FUNCTION post_activity_rollups_on_insert() RETURNS trigger AS $$
+        BEGIN
+            {_rollup_upsert(_rollup_delta("new_rows", ""))};
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE OR REPLACE FUNCTION post_activity_rollups_on_update() RETURNS trigger AS $$
+        BEGIN
+            {_rollup_upsert(_rollup_delta("new_rows", "") + " UNION ALL " + _rollup_delta("old_rows", "-"))};
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE OR REPLACE FUNCTION post_activity_rollups_on_delete() RETURNS trigger AS $$
+        BEGIN
+            {_rollup_upsert(_rollup_delta("old_rows", "-"))};
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER posts_rollup_insert AFTER INSERT ON posts
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION post_activity_rollups_on_insert()
+        """,
+        """
+        CREATE TRIGGER posts_rollup_update AFTER UPDATE ON posts
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION post_activity_rollups_on_update()
+        """,
+        """
+        CREATE TRIGGER posts_rollup_delete AFTER DELETE ON posts
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION post_activity_rollups_on_delete()
+        """,
+    ],
+    "sqlite": [
+        f"""
+        CREATE TRIGGER posts_rollup_ai AFTER INSERT ON posts BEGIN
+            {_sqlite_rollup_add("new", "")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER posts_rollup_au AFTER UPDATE OF content, created_at ON posts BEGIN
+            {_sqlite_rollup_add("old", "-")}
+            {_sqlite_rollup_add("new", "")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER posts_rollup_ad AFTER DELETE ON posts BEGIN
+            {_sqlite_rollup_add("old", "-")}
+        END
+        """,
+    ],
+}
+
+_listen_ddl(Post.__table__, "after_create", ROLLUP_DDL)
+
+# Таблица сводки создается после posts и заполняется по уже существующим постам
+# (пересчет на работающей базе — python -m app.tools.backfill_rollups).
+PostActivityRollup.__table__.add_is_dependent_on(Post.__table__)
+_listen_ddl(PostActivityRollup.__table__, "after_create", {
+    dialect: [
+        f"""
+        INSERT INTO post_activity_rollups (bucket, post_count, content_length)
+        SELECT {activity_bucket_sql(dialect, "created_at").replace("%", "%%")}, count(*), sum(length(content))
+        FROM posts GROUP BY 1
+        """
+    ]
+    for dialect in ("postgresql", "sqlite")
+})
@@ -4,9 +4,12 @@
 Используются для валидации входных данных API и форматирования выходных данных.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
+from typing_extensions import TypedDict # Pydantic требует TypedDict из typing_extensions на Python < 3.12
+
+from app.core.config import settings
 
 class PostBase(BaseModel):
     """
@@ -47,4 +50,143 @@ class PostInDB(PostBase):
     #     напрямую из ORM-моделей SQLAlchemy.
     #     """
     #     from_attributes = True # Для Pydantic v2
-    #     # orm_mode = True # Для Pydantic v1
\ No newline at end of file
+    #     # orm_mode = True # Для Pydantic v1
+
+
+class PostBulkUpdate(BaseModel):
+    """
+    Схема массового обновления: одни и те же изменения для нескольких постов.
+    """
+    ids: List[int] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+    changes: PostUpdate
+
+
+class PostBulkUpdateResult(BaseModel):
+    """
+    Результат массового обновления: обновленные посты и ID, которых нет в БД.
+    """
+    updated: List[PostInDB]
+    not_found: List[int]
+
+
+class PostBulkDeleteResult(BaseModel):
+    """
+    Результат массового удаления: удаленные посты и ID, которых нет в БД.
+    """
+    deleted: List[PostInDB]
+    not_found: List[int]
+
+
+class PostChange(BaseModel):
+    """
+    Изменение в ленте изменений: создание или обновление поста (upsert,
+    с актуальными данными поста) либо удаление (delete, только ID).
+    """
+    op: Literal["upsert", "delete"]
+    id: int
+    post: Optional[PostInDB] = None
+
+
+class PostChangesPage(BaseModel):
+    """
+    Порция ленты изменений. `next_token` передается в следующий запрос как `since`.
+    """
+    changes: List[PostChange]
+    next_token: str
+    has_more: bool
+
+
+class PostTitleSuggestion(BaseModel):
+    """
+    Подсказка автодополнения заголовка.
+    """
+    id: int
+    title: str
+
+
+class PostActivityBucket(BaseModel):
+    """
+    Активность за час или день: количество постов и средняя длина содержимого.
+    """
+    start: datetime
+    posts: int
+    avg_content_length: float
+
+
+class PostActivityStats(BaseModel):
+    """
+    Статистика активности за интервал [start, end) по часам или дням.
+    Интервалы без постов не включаются в `buckets`.
+    """
+    granularity: Literal["hour", "day"]
+    start: datetime
+    end: datetime
+    total_posts: int
+    avg_content_length: Optional[float] = None
+    buckets: List[PostActivityBucket]
+
+
+class PostSummary(BaseModel):
+    """
+    Краткая схема поста для лент: без полного содержимого, с отрывком,
+    вычисленным на стороне БД.
+    """
+    id: int
+    title: str
+    excerpt: str
+    created_at: datetime
+
+
+class PostFields(BaseModel):
+    """
+    Пост с выбранными полями (параметр fields списка постов): в ответе
+    есть только запрошенные поля.
+    """
+    id: Optional[int] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    excerpt: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+# Поля, которые можно запросить в списке постов через параметр fields
+POST_LIST_FIELDS = tuple(PostInDB.model_fields) + ("excerpt",)
+# Поля краткого представления (view=summary)
+POST_SUMMARY_FIELDS = tuple(PostSummary.model_fields)
+
+
+class PostRow(TypedDict):
+    """
+    Строка поста для быстрой сериализации списков без создания и валидации
+    моделей PostInDB. Поля совпадают с PostInDB и идут в том же порядке.
+    """
+    title: str
+    content: str
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+# Заранее построенный адаптер: строки из БД сериализуются сразу в JSON-байты.
+# Ключи выводятся в порядке ключей входного словаря, поэтому строки должны
+# собираться в порядке полей PostInDB — тогда вывод побайтно совпадает с
+# сериализацией FastAPI через response_model=List[PostInDB].
+post_rows_adapter = TypeAdapter(list[PostRow])
+
+
+
+class PartialPostRow(TypedDict, total=False):
+    """
+    Строка поста с произвольным подмножеством полей (sparse fieldsets и
+    краткое представление). Выводятся только присутствующие ключи.
+    """
+    title: str
+    content: str
+    excerpt: str
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+partial_post_rows_adapter = TypeAdapter(list[PartialPostRow])
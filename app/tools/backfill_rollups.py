@@ -0,0 +1,29 @@
+"""
+Пересчет сводки активности постов (post_activity_rollups) по существующим данным.
+
+Нужен после включения сводки на базе, где посты уже есть, или после загрузки
+данных в обход триггеров. В PostgreSQL на время пересчета запись в posts
+блокируется (чтение продолжает работать).
+
+Пример:
+    python -m app.tools.backfill_rollups
+"""
+import asyncio
+import time
+
+from app.core.database import async_session, engine
+from app.crud.post import post_crud
+
+
+async def main() -> None:
+    try:
+        start = time.perf_counter()
+        async with async_session() as session:
+            buckets = await post_crud.rebuild_activity_rollups(session)
+        print(f"Сводка пересчитана: {buckets} часовых интервалов за {time.perf_counter() - start:.1f} с")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
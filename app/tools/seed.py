@@ -0,0 +1,221 @@
+"""
+Генератор синтетических постов для нагрузочного тестирования и оценки емкости.
+
+Создает заданное количество постов с настраиваемыми распределениями длины
+заголовка и содержимого и временем создания, равномерно распределенным
+по интервалу. Данные детерминированы: одинаковые параметры и --seed дают
+одинаковые строки.
+
+Загрузка идет массовым путем: COPY для asyncpg (PostgreSQL), пакетный
+executemany для остальных драйверов (SQLite). Триггеры БД (счетчик постов,
+лента изменений, полнотекстовый поиск SQLite) срабатывают для каждой строки,
+как при обычной вставке.
+
+Используется база данных из настроек приложения (DATABASE_URL или TEST_DB_URL
+в режиме TEST).
+
+Примеры:
+    python -m app.tools.seed --rows 1000000 --seed 42 --create-tables
+    python -m app.tools.seed --rows 200000 --title-length normal:40:12 --content-length lognormal:7:0.8
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Literal
+
+from sqlalchemy import insert, make_url
+
+from app.core.database import Base, engine, slow_query_log
+from app.models.post import Post
+
+TITLE_MAX_LENGTH = 256  # Ограничение столбца posts.title
+CONTENT_MIN_LENGTH = 10  # Ограничение схемы PostCreate
+CORPUS_LENGTH = 1 << 20  # Размер общего текста, из которого берутся фрагменты
+
+WORDS = (
+    "пост", "данные", "запрос", "индекс", "страница", "сервер", "клиент", "ответ",
+    "таблица", "строка", "поиск", "кэш", "пул", "соединение", "транзакция", "план",
+    "база", "ключ", "значение", "событие", "поток", "очередь", "задача", "время",
+    "post", "query", "index", "latency", "throughput", "cursor", "batch", "replica",
+    "быстро", "медленно", "новый", "старый", "большой", "малый", "первый", "последний",
+)
+
+
+@dataclass(frozen=True)
+class LengthDistribution:
+    """
+    Распределение длины текста в символах.
+
+    uniform:a:b — равномерное на [a, b]; normal:a:b — нормальное со средним a
+    и отклонением b; lognormal:a:b — логнормальное с параметрами mu=a, sigma=b
+    (длинный хвост, как у реальных текстов).
+    """
+    kind: Literal["uniform", "normal", "lognormal"]
+    a: float
+    b: float
+
+    def sample(self, rng: random.Random, low: int, high: int) -> int:
+        if self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        else:
+            value = rng.lognormvariate(self.a, self.b)
+        return min(max(int(value), low), high)
+
+
+def parse_distribution(spec: str) -> LengthDistribution:
+    """
+    Разбирает распределение из строки вида "kind:a:b" (для argparse).
+    """
+    try:
+        kind, a, b = spec.split(":")
+        if kind not in ("uniform", "normal", "lognormal"):
+            raise ValueError(kind)
+        return LengthDistribution(kind, float(a), float(b))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Ожидается uniform:a:b, normal:mean:std или lognormal:mu:sigma, получено {spec!r}"
+        )
+
+
+def build_corpus(rng: random.Random, length: int = CORPUS_LENGTH) -> str:
+    """
+    Строит общий текст из словаря; тексты постов — его фрагменты.
+    """
+    words = rng.choices(WORDS, k=length // 6)
+    return (" ".join(words) + " ")[:length]
+
+
+def generate_rows(
+    count: int,
+    seed: int,
+    title_length: LengthDistribution,
+    content_length: LengthDistribution,
+    start: datetime,
+    end: datetime,
+) -> Iterator[tuple[str, str, datetime]]:
+    """
+    Генерирует строки постов (title, content, created_at).
+
+    Args:
+        count (int): Количество строк.
+        seed (int): Начальное значение генератора случайных чисел.
+        title_length (LengthDistribution): Распределение длины заголовка.
+        content_length (LengthDistribution): Распределение длины содержимого.
+        start (datetime): Начало интервала времени создания.
+        end (datetime): Конец интервала времени создания.
+
+    Yields:
+        tuple[str, str, datetime]: Заголовок, содержимое и время создания (UTC).
+    """
+    rng = random.Random(seed)
+    corpus = build_corpus(rng)
+    span = (end - start).total_seconds()
+    content_max = len(corpus)
+    for _ in range(count):
+        title_size = title_length.sample(rng, 1, TITLE_MAX_LENGTH)
+        content_size = content_length.sample(rng, CONTENT_MIN_LENGTH, content_max)
+        title_offset = rng.randrange(len(corpus) - title_size + 1)
+        content_offset = rng.randrange(len(corpus) - content_size + 1)
+        created_at = start + timedelta(seconds=rng.random() * span)
+        yield (
+            corpus[title_offset:title_offset + title_size],
+            corpus[content_offset:content_offset + content_size],
+            created_at,
+        )
+
+
+def _batches(rows: Iterator[tuple], size: int) -> Iterator[list[tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def seed_posts(rows: Iterator[tuple[str, str, datetime]], batch_size: int = 10000) -> int:
+    """
+    Загружает строки постов в базу данных массовым путем.
+
+    Каждый пакет вставляется в отдельной транзакции, чтобы не держать
+    одну транзакцию на миллионы строк.
+
+    Args:
+        rows (Iterator[tuple[str, str, datetime]]): Строки (title, content, created_at).
+        batch_size (int): Количество строк в пакете.
+
+    Returns:
+        int: Количество загруженных строк.
+    """
+    use_copy = make_url(str(engine.url)).get_driver_name() == "asyncpg"
+    columns = ("title", "content", "created_at")
+    loaded = 0
+    async with engine.connect() as conn:
+        for batch in _batches(rows, batch_size):
+            if use_copy:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    Post.__tablename__, records=batch, columns=columns
+                )
+            else:
+                await conn.execute(insert(Post.__table__), [dict(zip(columns, row)) for row in batch])
+            await conn.commit()
+            loaded += len(batch)
+    return loaded
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Пакеты загрузки заведомо дольше порога медленных запросов
+    slow_query_log.threshold_ms = -1
+    try:
+        if args.create_tables:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        rows = generate_rows(
+            args.rows, args.seed, args.title_length, args.content_length,
+            args.end - timedelta(days=args.span_days), args.end,
+        )
+        start = time.perf_counter()
+        loaded = await seed_posts(rows, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"Загружено {loaded} постов за {elapsed:.1f} с ({loaded / elapsed if elapsed else math.inf:,.0f} строк/с)")
+    finally:
+        await engine.dispose()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Генератор синтетических постов")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Количество постов")
+    parser.add_argument("--seed", type=int, default=0, help="Начальное значение генератора")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Строк в пакете загрузки")
+    parser.add_argument(
+        "--title-length", type=parse_distribution, default=parse_distribution("normal:40:15"),
+        help="Распределение длины заголовка (uniform:a:b, normal:mean:std, lognormal:mu:sigma)",
+    )
+    parser.add_argument(
+        "--content-length", type=parse_distribution, default=parse_distribution("lognormal:6.5:1.0"),
+        help="Распределение длины содержимого",
+    )
+    parser.add_argument(
+        "--end", type=datetime.fromisoformat, default=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        help="Конец интервала времени создания (ISO 8601; фиксирован по умолчанию для воспроизводимости)",
+    )
+    parser.add_argument("--span-days", type=float, default=365.0, help="Длина интервала времени создания в днях")
+    parser.add_argument("--create-tables", action="store_true", help="Создать таблицы перед загрузкой")
+    args = parser.parse_args(argv)
+    if args.end.tzinfo is None:
+        args.end = args.end.replace(tzinfo=timezone.utc)
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
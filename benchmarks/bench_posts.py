@@ -0,0 +1,289 @@
+"""
+Нагрузочный бенчмарк эндпоинтов постов.
+
+Прогоняет сценарии create, get-by-id, list (на нескольких глубинах страниц,
+OFFSET и курсор), update и delete с заданной конкурентностью и размером
+набора данных, замеряет пропускную способность и задержки p50/p95/p99
+и сохраняет результаты в JSON для сравнения прогонов.
+
+Два транспорта:
+- asgi: приложение вызывается внутри процесса через httpx.ASGITransport
+  (как в tests/conftest.py) — без сетевых накладных расходов;
+- uvicorn: приложение запускается отдельным процессом uvicorn, запросы идут
+  по HTTP через loopback.
+
+Бенчмарк использует базу данных из настроек приложения (DATABASE_URL или
+TEST_DB_URL в режиме TEST) и добавляет в нее данные — запускайте его на
+отдельной базе.
+
+Примеры:
+    python -m benchmarks.bench_posts --transport asgi --concurrency 16 --dataset-size 5000
+    python -m benchmarks.bench_posts --transport uvicorn --output bench.json --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import httpx
+
+from app.core.database import Base, engine
+
+API = "/api/v1/posts"
+BULK_CHUNK = 500
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    Вычисляет перцентиль по отсортированному списку (метод ближайшего ранга).
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    requests: int,
+    concurrency: int,
+    call: Callable[[int], Awaitable[httpx.Response]],
+    expected_status: int = 200,
+) -> dict:
+    """
+    Выполняет `requests` вызовов `call(i)` в `concurrency` параллельных потоках.
+
+    Returns:
+        dict: Количество запросов и ошибок, пропускная способность (rps)
+        и задержки в миллисекундах.
+    """
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await call(i)
+                ok = response.status_code == expected_status
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    to_ms = 1000.0
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": requests / wall if wall else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * to_ms if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * to_ms,
+        "p95_ms": percentile(latencies, 0.95) * to_ms,
+        "p99_ms": percentile(latencies, 0.99) * to_ms,
+    }
+
+
+def post_payload(i: int) -> dict:
+    return {"title": f"Бенчмарк пост {i}", "content": f"Содержимое бенчмарк-поста номер {i}. " * 8}
+
+
+async def seed(client: httpx.AsyncClient, dataset_size: int) -> list[int]:
+    """
+    Заполняет базу `dataset_size` постами через массовое создание.
+    """
+    ids: list[int] = []
+    for start in range(0, dataset_size, BULK_CHUNK):
+        chunk = [post_payload(i) for i in range(start, min(start + BULK_CHUNK, dataset_size))]
+        response = await client.post(f"{API}/bulk", json=chunk)
+        response.raise_for_status()
+        ids.extend(post["id"] for post in response.json())
+    return ids
+
+
+async def run_suite(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    """
+    Прогоняет все сценарии и возвращает результаты по каждому из них.
+    """
+    ids = await seed(client, args.dataset_size)
+    results: dict[str, dict] = {}
+    n, c = args.requests, args.concurrency
+
+    created_ids: list[int] = []
+
+    async def create(i):
+        response = await client.post(f"{API}/", json=post_payload(i))
+        if response.status_code == 201:
+            created_ids.append(response.json()["id"])
+        return response
+
+    results["create"] = await run_scenario(n, c, create, expected_status=201)
+
+    read_ids = ids or created_ids
+    results["get_by_id"] = await run_scenario(
+        n, c, lambda i: client.get(f"{API}/{read_ids[i % len(read_ids)]}")
+    )
+
+    for depth in args.depths:
+        results[f"list_offset_{depth}"] = await run_scenario(
+            n, c, lambda i, depth=depth: client.get(f"{API}/", params={"skip": depth, "limit": args.page_size})
+        )
+        # Курсор, указывающий на ту же глубину, получаем одним запросом (курсор после поста depth - 1)
+        cursor = (
+            await client.get(f"{API}/", params={"skip": depth - 1, "limit": 1, "fields": "id"})
+        ).headers.get("X-Next-Cursor") if depth else None
+        params = {"limit": args.page_size, **({"cursor": cursor} if cursor else {})}
+        results[f"list_cursor_{depth}"] = await run_scenario(
+            n, c, lambda i, params=params: client.get(f"{API}/", params=params)
+        )
+
+    results["update"] = await run_scenario(
+        n, c, lambda i: client.put(
+            f"{API}/{created_ids[i % len(created_ids)]}", json={"title": f"Обновленный пост {i}"}
+        )
+    )
+    results["delete"] = await run_scenario(
+        len(created_ids), c, lambda i: client.delete(f"{API}/{created_ids[i]}")
+    )
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{API}/", params={"limit": 1})
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn не запустился за отведенное время")
+
+
+async def main(args: argparse.Namespace) -> dict:
+    async with engine.begin() as conn:
+        if args.reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.transport == "asgi":
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+            results = await run_suite(client, args)
+        await engine.dispose()
+    else:
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            env=os.environ.copy(),
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            await wait_until_ready(base_url)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+                results = await run_suite(client, args)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "transport": args.transport,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "dataset_size": args.dataset_size,
+            "page_size": args.page_size,
+            "depths": args.depths,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Сравнивает результаты с базовым прогоном.
+
+    Returns:
+        list[str]: Описания регрессий: p95 выросла или пропускная способность
+        упала больше чем на `threshold` (доля).
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if base["throughput_rps"] and result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {base['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} rps"
+            )
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк эндпоинтов постов")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на сценарий")
+    parser.add_argument("--dataset-size", type=int, default=2000, help="Постов в базе перед прогоном")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument(
+        "--depths", type=lambda value: [int(item) for item in value.split(",")], default=[0, 100, 1000],
+        help="Глубины страниц списка через запятую",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Воркеров uvicorn (транспорт uvicorn)")
+    parser.add_argument("--reset", action="store_true", help="Пересоздать таблицы перед прогоном")
+    parser.add_argument("--output", help="Файл для сохранения результатов в JSON")
+    parser.add_argument("--compare", help="JSON базового прогона для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Допустимое ухудшение (доля)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = asyncio.run(main(arguments))
+
+    for scenario, result in report["results"].items():
+        print(
+            f"{scenario:<20} {result['throughput_rps']:>9.1f} rps  "
+            f"p50 {result['p50_ms']:>7.2f}  p95 {result['p95_ms']:>7.2f}  "
+            f"p99 {result['p99_ms']:>7.2f} ms  errors {result['errors']}"
+        )
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as file:
+            found = compare(report, json.load(file), arguments.threshold)
+        for line in found:
+            print(f"РЕГРЕССИЯ {line}")
+        sys.exit(1 if found else 0)
@@ -0,0 +1,74 @@
+"""
+Микро-бенчмарк сериализации списка постов.
+
+Сравнивает стандартный путь FastAPI (валидация ORM-объектов в List[PostInDB]
+через response_model и JSONResponse) с быстрым путем read_posts (строки из БД
+сериализуются адаптером post_rows_adapter сразу в JSON-байты) и проверяет,
+что оба пути дают побайтно одинаковый результат.
+
+Пример:
+    python -m benchmarks.bench_serialization --rows 100 --content-size 5000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.models.post import Post
+from app.schemas.post import PostInDB, post_rows_adapter
+
+
+def make_rows(count: int, content_size: int) -> list[dict]:
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "title": f"Пост номер {i}",
+            "content": ("Съешь же ещё этих мягких французских булок. " * content_size)[:content_size],
+            "id": i,
+            "created_at": created_at + timedelta(seconds=i),
+            "updated_at": None if i % 2 else created_at + timedelta(days=1, microseconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+async def main(args: argparse.Namespace) -> None:
+    rows = make_rows(args.rows, args.content_size)
+    posts = [Post(**row) for row in rows]
+    field = create_model_field("Response", List[PostInDB], mode="serialization")
+
+    async def fastapi_path() -> bytes:
+        content = await serialize_response(field=field, response_content=posts)
+        return JSONResponse(content).body
+
+    def fast_path() -> bytes:
+        return post_rows_adapter.dump_json(rows)
+
+    assert await fastapi_path() == fast_path(), "Результаты сериализации различаются"
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        await fastapi_path()
+    standard = (time.perf_counter() - start) / args.iterations
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        fast_path()
+    fast = (time.perf_counter() - start) / args.iterations
+
+    print(f"response_model + JSONResponse: {standard * 1000:8.3f} ms на ответ")
+    print(f"post_rows_adapter.dump_json:  {fast * 1000:8.3f} ms на ответ")
+    print(f"Ускорение: {standard / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Микро-бенчмарк сериализации списка постов")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--content-size", type=int, default=5000, help="Длина content в символах")
+    parser.add_argument("--iterations", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -1,3 +1,5 @@
 import os
 
 os.environ["MODE"] = "TEST"
+# Запросы, превысившие объявленный бюджет обращений к БД, завершаются ошибкой
+os.environ["QUERY_BUDGET_ENFORCE"] = "true"
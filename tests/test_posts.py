@@ -153,4 +153,965 @@ async def test_delete_post_not_found(client: AsyncClient):
     """
     response = await client.delete("/api/v1/posts/999999")
     assert response.status_code == 404
-    # assert response.json() == {"detail": "Post not found"}
\ No newline at end of file
+    # assert response.json() == {"detail": "Post not found"}
+
+@pytest.mark.asyncio
+async def test_read_posts_cursor_pagination(client: AsyncClient):
+    """
+    Тест курсорной пагинации: страницы не пересекаются и идут от новых к старым.
+    """
+    created_ids = []
+    for i in range(5):
+        response = await client.post(
+            "/api/v1/posts/",
+            json={"title": f"Пост курсора {i}", "content": "Содержимое для пагинации."}
+        )
+        created_ids.append(response.json()["id"])
+
+    seen_ids = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/api/v1/posts/", params=params)
+        assert response.status_code == 200
+        seen_ids.extend(post["id"] for post in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert len(seen_ids) == len(set(seen_ids))
+    assert set(created_ids) <= set(seen_ids)
+    # Недавно созданные посты идут первыми, в порядке от новых к старым
+    assert seen_ids[:5] == created_ids[::-1]
+
+
+@pytest.mark.asyncio
+async def test_read_posts_invalid_cursor(client: AsyncClient):
+    """
+    Тест передачи поврежденного курсора, в том числе со значениями,
+    которые переполняют числа или параметры запроса к БД.
+    """
+    import base64
+
+    def crafted(raw: str) -> str:
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    response = await client.get("/api/v1/posts/", params={"cursor": "не-курсор"})
+    assert response.status_code == 400
+    for raw in ('["2024-01-01T00:00:00+00:00",1e400]', '["2024-01-01T00:00:00+00:00",4294967296]'):
+        response = await client.get("/api/v1/posts/", params={"cursor": crafted(raw)})
+        assert response.status_code == 400
+    for raw in ("[1e400,1]", "[1.0,1e400]"):
+        response = await client.get("/api/v1/posts/search", params={"q": "пост", "cursor": crafted(raw)})
+        assert response.status_code == 400
+    for raw in ("[1e400]", "[-1]", "[9223372036854775808]", "[1,-1]", "[1,2,3]"):
+        response = await client.get("/api/v1/posts/changes", params={"since": crafted(raw)})
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_read_single_post_cache(client: AsyncClient):
+    """
+    Тест кэширования поста при чтении по ID и инвалидации кэша при записи.
+    """
+    from app.crud.post import post_crud
+
+    create_response = await client.post(
+        "/api/v1/posts/",
+        json={"title": "Кэшируемый пост", "content": "Содержимое кэшируемого поста."}
+    )
+    post_id = create_response.json()["id"]
+
+    await client.get(f"/api/v1/posts/{post_id}")
+    hits_before = post_crud.cache.stats()["hits"]
+    response = await client.get(f"/api/v1/posts/{post_id}")
+    assert response.status_code == 200
+    assert post_crud.cache.stats()["hits"] == hits_before + 1
+
+    await client.put(f"/api/v1/posts/{post_id}", json={"title": "Обновленный кэшируемый пост"})
+    response = await client.get(f"/api/v1/posts/{post_id}")
+    assert response.json()["title"] == "Обновленный кэшируемый пост"
+
+    await client.delete(f"/api/v1/posts/{post_id}")
+    response = await client.get(f"/api/v1/posts/{post_id}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_remote_write_invalidates_cache(client: AsyncClient, monkeypatch):
+    """
+    Тест сброса кэшей по записи другого воркера: событие из моста
+    LISTEN/NOTIFY удаляет пост из кэша, собственные уведомления моста
+    кэш не трогают; без моста при нескольких воркерах кэш отключен.
+    """
+    import asyncio
+    import json
+
+    from sqlalchemy import update
+
+    from app.core.database import async_session
+    from app.core.events import Broadcaster, PgNotifyBridge
+    from app.crud.post import post_crud
+    from app.models.post import Post
+
+    post_id = (await client.post(
+        "/api/v1/posts/", json={"title": "Пост другого воркера", "content": "Содержимое для сброса кэша"}
+    )).json()["id"]
+    await client.get(f"/api/v1/posts/{post_id}")
+
+    # Запись другого воркера: в этом процессе кэш о ней не знает
+    async with async_session() as session:
+        await session.execute(update(Post).where(Post.id == post_id).values(title="Изменен другим воркером"))
+        await session.commit()
+    response = await client.get(f"/api/v1/posts/{post_id}")
+    assert response.json()["title"] == "Пост другого воркера"
+
+    remote = []
+
+    async def on_remote_event(event):
+        remote.append(event)
+        await post_crud.apply_remote_write(event)
+
+    broadcaster = Broadcaster(max_subscribers=1, queue_size=10)
+    bridge = PgNotifyBridge(broadcaster, "postgresql+asyncpg://localhost/db", on_remote_event=on_remote_event)
+    bridge._server_pid = 1
+    receiver = asyncio.create_task(bridge._receive_loop())
+    try:
+        with broadcaster.subscribe() as subscription:
+            payload = json.dumps({"op": "update", "items": [{"id": post_id}]})
+            bridge._on_notify(None, 1, bridge.channel, payload)
+            bridge._on_notify(None, 2, bridge.channel, payload)
+            events = [await subscription.get() for _ in range(2)]
+    finally:
+        receiver.cancel()
+    assert len(events) == 2
+    assert len(remote) == 1
+
+    response = await client.get(f"/api/v1/posts/{post_id}")
+    assert response.json()["title"] == "Изменен другим воркером"
+
+    from app.core.cache import create_post_cache
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    assert create_post_cache() is None
+    monkeypatch.setattr(settings, "POST_EVENTS_PG_NOTIFY", True)
+    assert create_post_cache() is not None
+
+
+@pytest.mark.asyncio
+async def test_create_posts_bulk(client: AsyncClient):
+    """
+    Тест массового создания постов.
+    """
+    payload = [
+        {"title": f"Массовый пост {i}", "content": "Содержимое массового поста."}
+        for i in range(3)
+    ]
+    response = await client.post("/api/v1/posts/bulk", json=payload)
+    assert response.status_code == 201
+    data = response.json()
+    assert [post["title"] for post in data] == [item["title"] for item in payload]
+    assert len({post["id"] for post in data}) == 3
+
+
+@pytest.mark.asyncio
+async def test_create_posts_bulk_invalid_item(client: AsyncClient):
+    """
+    Тест массового создания с некорректным элементом: ошибка указывает на элемент.
+    """
+    payload = [
+        {"title": "Корректный пост", "content": "Корректное содержимое."},
+        {"title": "", "content": "Корректное содержимое."},
+    ]
+    response = await client.post("/api/v1/posts/bulk", json=payload)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:2] == ["body", 1]
+
+
+@pytest.mark.asyncio
+async def test_export_posts(client: AsyncClient):
+    """
+    Тест потоковой выгрузки постов в форматах NDJSON и CSV.
+    """
+    import csv
+    import io
+    import json
+
+    create_response = await client.post(
+        "/api/v1/posts/",
+        json={"title": "Пост для выгрузки", "content": "Содержимое, с запятой и \"кавычками\"."}
+    )
+    post_id = create_response.json()["id"]
+
+    response = await client.get("/api/v1/posts/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    exported = next(row for row in rows if row["id"] == post_id)
+    assert exported["content"] == "Содержимое, с запятой и \"кавычками\"."
+
+    response = await client.get("/api/v1/posts/export", params={"format": "csv"})
+    assert response.status_code == 200
+    reader = csv.DictReader(io.StringIO(response.text))
+    exported = next(row for row in reader if row["id"] == str(post_id))
+    assert exported["title"] == "Пост для выгрузки"
+    assert exported["content"] == "Содержимое, с запятой и \"кавычками\"."
+
+
+@pytest.mark.asyncio
+async def test_search_posts(client: AsyncClient):
+    """
+    Тест полнотекстового поиска с пагинацией по релевантности.
+    """
+    payload = [
+        {"title": "Квазар в заголовке", "content": "Наблюдения далекого квазара."},
+        {"title": "Обычный пост", "content": "Упоминание слова квазар в тексте."},
+        {"title": "Посторонний пост", "content": "Здесь нет искомого слова."},
+    ]
+    response = await client.post("/api/v1/posts/bulk", json=payload)
+    ids = [post["id"] for post in response.json()]
+
+    found_ids = []
+    cursor = None
+    while True:
+        params = {"q": "квазар", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/api/v1/posts/search", params=params)
+        assert response.status_code == 200
+        found_ids.extend(post["id"] for post in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert found_ids == [ids[0], ids[1]]
+
+    await client.put(f"/api/v1/posts/{ids[2]}", json={"content": "Теперь и здесь есть квазар."})
+    response = await client.get("/api/v1/posts/search", params={"q": "квазар"})
+    assert ids[2] in [post["id"] for post in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_read_single_post_conditional(client: AsyncClient):
+    """
+    Тест условного GET поста: 304 при совпадении ETag и новый ETag после обновления.
+    """
+    create_response = await client.post(
+        "/api/v1/posts/",
+        json={"title": "Пост с ETag", "content": "Содержимое поста с ETag."}
+    )
+    post_id = create_response.json()["id"]
+
+    response = await client.get(f"/api/v1/posts/{post_id}")
+    etag = response.headers["ETag"]
+    assert "Last-Modified" in response.headers
+
+    response = await client.get(f"/api/v1/posts/{post_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    last_modified = response.headers["Last-Modified"]
+    response = await client.get(
+        f"/api/v1/posts/{post_id}", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    await client.put(f"/api/v1/posts/{post_id}", json={"title": "Пост с новым ETag"})
+    response = await client.get(f"/api/v1/posts/{post_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_read_posts_conditional(client: AsyncClient):
+    """
+    Тест условного GET списка постов: 304 до изменения и 200 после создания поста.
+    """
+    response = await client.get("/api/v1/posts/", params={"limit": 5})
+    etag = response.headers["ETag"]
+
+    response = await client.get(
+        "/api/v1/posts/", params={"limit": 5}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    await client.post(
+        "/api/v1/posts/",
+        json={"title": "Новый пост в списке", "content": "Меняет первую страницу."}
+    )
+    response = await client.get(
+        "/api/v1/posts/", params={"limit": 5}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_read_pool_stats(client: AsyncClient):
+    """
+    Тест эндпоинта статистики пула соединений.
+    """
+    response = await client.get("/api/v1/diagnostics/pool")
+    assert response.status_code == 200
+    assert "pool_class" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_metrics(client: AsyncClient):
+    """
+    Тест метрик: задержка по шаблону маршрута и количество запросов к БД.
+    """
+    create_response = await client.post(
+        "/api/v1/posts/",
+        json={"title": "Пост для метрик", "content": "Содержимое поста для метрик."}
+    )
+    post_id = create_response.json()["id"]
+    await client.get("/api/v1/posts/", params={"limit": 5})
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/posts/",status="200"}' in text
+    assert f"/api/v1/posts/{post_id}" not in text
+    assert 'http_request_db_queries_count{method="GET",route="/api/v1/posts/"}' in text
+    assert "db_query_duration_seconds_count" in text
+    # Показатели по словарям статистики компонентов
+    assert 'post_cache{stat="hits"}' in text
+    assert 'post_events{stat="published"}' in text
+
+
+@pytest.mark.asyncio
+async def test_mutations_single_round_trip(client: AsyncClient):
+    """
+    Тест: создание, обновление и удаление поста выполняются одним запросом к БД.
+    """
+    from app.core.query_budget import capture_queries
+
+    with capture_queries() as queries:
+        create_response = await client.post(
+            "/api/v1/posts/",
+            json={"title": "Пост за один запрос", "content": "Содержимое поста за один запрос."}
+        )
+    assert create_response.status_code == 201
+    assert len(queries) == 1
+    post_id = create_response.json()["id"]
+
+    with capture_queries() as queries:
+        response = await client.put(f"/api/v1/posts/{post_id}", json={"title": "Обновлен за один запрос"})
+    assert response.status_code == 200
+    assert len(queries) == 1
+
+    with capture_queries() as queries:
+        response = await client.delete(f"/api/v1/posts/{post_id}")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Обновлен за один запрос"
+    assert len(queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_posts_fast_serialization_matches_response_model(client: AsyncClient):
+    """
+    Тест: быстрый путь сериализации списка дает те же байты, что и response_model.
+    """
+    import json
+
+    from fastapi.encoders import jsonable_encoder
+
+    from app.schemas.post import PostInDB
+
+    await client.post(
+        "/api/v1/posts/",
+        json={"title": "Пост \"с кавычками\"", "content": "Строка\nс переносом и юникодом: ё ✓"}
+    )
+    response = await client.get("/api/v1/posts/", params={"limit": 10})
+    posts = [PostInDB(**item) for item in response.json()]
+    expected = json.dumps(
+        jsonable_encoder(posts), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+    assert response.content == expected
+
+
+@pytest.mark.asyncio
+async def test_read_posts_sparse_fields_and_summary(client: AsyncClient):
+    """
+    Тест выбора полей списка и краткого представления с отрывком,
+    ограничения limit и схемы ответа в OpenAPI.
+    """
+    long_content = "Очень длинное содержимое поста. " * 50
+    await client.post("/api/v1/posts/", json={"title": "Длинный пост", "content": long_content})
+
+    response = await client.get("/api/v1/posts/", params={"limit": 1, "fields": "title,id"})
+    assert response.status_code == 200
+    assert list(response.json()[0]) == ["title", "id"]
+
+    response = await client.get("/api/v1/posts/", params={"limit": 1, "view": "summary"})
+    post = response.json()[0]
+    assert list(post) == ["id", "title", "excerpt", "created_at"]
+    assert post["excerpt"] == long_content[:200]
+
+    response = await client.get("/api/v1/posts/", params={"fields": "title,password"})
+    assert response.status_code == 400
+
+    response = await client.get("/api/v1/posts/", params={"limit": 1001})
+    assert response.status_code == 422
+
+    # Схема OpenAPI описывает все варианты строки списка
+    schema = (await client.get("/api/v1/openapi.json")).json()
+    items = schema["paths"]["/api/v1/posts/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]["items"]
+    assert {ref["$ref"].rsplit("/", 1)[1] for ref in items["anyOf"]} == {"PostInDB", "PostSummary", "PostFields"}
+
+
+@pytest.mark.asyncio
+async def test_read_posts_total_count(client: AsyncClient):
+    """
+    Тест заголовка X-Total-Count: счетчик совпадает с точным подсчетом
+    после создания, массового создания и удаления постов.
+    """
+    created = await client.post("/api/v1/posts/", json={"title": "Счетчик", "content": "Текст поста для счетчика"})
+    await client.post(
+        "/api/v1/posts/bulk",
+        json=[{"title": f"Счетчик {i}", "content": "Текст поста для счетчика"} for i in range(3)]
+    )
+    await client.delete(f"/api/v1/posts/{created.json()['id']}")
+
+    response = await client.get("/api/v1/posts/", params={"limit": 1})
+    assert "X-Total-Count" not in response.headers
+
+    fast = await client.get("/api/v1/posts/", params={"limit": 1, "count": "fast"})
+    exact = await client.get("/api/v1/posts/", params={"limit": 1, "count": "exact"})
+    assert fast.status_code == exact.status_code == 200
+    assert fast.headers["X-Total-Count"] == exact.headers["X-Total-Count"]
+    assert int(exact.headers["X-Total-Count"]) >= 3
+
+
+def test_replica_router_strategies():
+    """
+    Тест выбора реплики: по кругу и по наименьшему количеству активных сессий.
+    """
+    from app.core.replicas import ReplicaRouter
+
+    router = ReplicaRouter(["a", "b"])
+    assert [router.acquire() for _ in range(3)] == ["a", "b", "a"]
+
+    router = ReplicaRouter(["a", "b"], strategy="least_connections")
+    first = router.acquire()
+    second = router.acquire()
+    assert {first, second} == {"a", "b"}
+    router.release(second)
+    assert router.acquire() == second
+
+
+@pytest.mark.asyncio
+async def test_reads_routed_to_replica_with_read_your_writes(client: AsyncClient, tmp_path, monkeypatch):
+    """
+    Тест маршрутизации чтения на реплику (отдельный файл SQLite) и закрепления
+    клиента за основной БД после записи.
+    """
+    from httpx import ASGITransport
+    from sqlalchemy import insert
+    from sqlalchemy.pool import NullPool
+
+    from app.core import database
+    from app.core.database import Base, _create_engine
+    from app.core.replicas import ReplicaRouter
+    from app.main import app
+    from app.models.post import Post
+
+    replica = _create_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter([replica]))
+    try:
+        # Реплика пуста: чтение без недавней записи идет на нее
+        response = await client.get("/api/v1/posts/", params={"count": "exact"})
+        assert response.json() == []
+        assert response.headers["X-Total-Count"] == "0"
+
+        created = await client.post(
+            "/api/v1/posts/", json={"title": "Запись", "content": "Пост на основной БД"}
+        )
+        assert created.status_code == 201
+        assert "primary_until" in created.cookies
+
+        # Клиент, только что выполнивший запись, читает с основной БД
+        response = await client.get("/api/v1/posts/", params={"count": "exact"})
+        assert created.json()["id"] in [post["id"] for post in response.json()]
+
+        # Другой клиент без cookie по-прежнему читает с реплики
+        client.cookies.clear()
+        response = await client.get("/api/v1/posts/", params={"count": "exact"})
+        assert response.headers["X-Total-Count"] == "0"
+
+        # Отстающая реплика с первой версией поста не возвращает ее в кэш:
+        # клиент после записи видит свою версию, даже если другой клиент
+        # прочитал старую с реплики
+        post_id = created.json()["id"]
+        async with replica.begin() as conn:
+            await conn.execute(insert(Post.__table__).values(id=post_id, title="Запись", content="Пост на основной БД"))
+        updated = await client.put(f"/api/v1/posts/{post_id}", json={"title": "Запись v2", "content": "Пост на основной БД"})
+        assert updated.status_code == 200
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as other:
+            response = await other.get(f"/api/v1/posts/{post_id}")
+            assert response.json()["title"] == "Запись"
+        response = await client.get(f"/api/v1/posts/{post_id}")
+        assert response.json()["title"] == "Запись v2"
+    finally:
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_create_post_coalescing():
+    """
+    Тест группировки конкурентных созданий постов: один пакет, у каждого
+    вызывающего — свой пост.
+    """
+    import asyncio
+
+    from app.core.metrics import write_batch_size
+    from app.core.query_budget import capture_queries
+    from app.crud.post import CRUDPost
+    from app.schemas.post import PostCreate
+
+    crud = CRUDPost(coalesce_creates=True, batch_window=0.05, batch_max=100)
+    posts_in = [PostCreate(title=f"Пакетный пост {i}", content="Содержимое пакетного поста") for i in range(5)]
+    batches_before = write_batch_size.count("post_create")
+
+    with capture_queries() as queries:
+        posts = await asyncio.gather(*(crud.create_post(db=None, post_in=post_in) for post_in in posts_in))
+
+    assert [post.title for post in posts] == [post_in.title for post_in in posts_in]
+    assert len({post.id for post in posts}) == 5
+    assert write_batch_size.count("post_create") == batches_before + 1
+    assert len([statement for statement in queries if statement.lstrip().upper().startswith("INSERT")]) == 1
+
+
+@pytest.mark.asyncio
+async def test_frontend_renders_first_page_with_fragment_cache(client: AsyncClient):
+    """
+    Тест серверного рендеринга первой страницы постов и кэша фрагментов.
+    """
+    from app.core.query_budget import capture_queries
+    from app.main import fragment_cache
+
+    await client.post("/api/v1/posts/", json={"title": "Пост <на главной>", "content": "Текст поста на главной"})
+    response = await client.get("/")
+    assert response.status_code == 200
+    assert "Пост &lt;на главной&gt;" in response.text
+
+    # Повторный рендеринг: фрагмент из кэша, только легкий запрос версий
+    hits = fragment_cache.stats()["hits"]
+    with capture_queries() as queries:
+        again = await client.get("/")
+    assert again.text == response.text
+    assert fragment_cache.stats()["hits"] == hits + 1
+    assert len(queries) == 1
+
+    # Запись меняет версии страницы, и фрагмент рендерится заново
+    await client.post("/api/v1/posts/", json={"title": "Новый пост на главной", "content": "Текст нового поста"})
+    response = await client.get("/")
+    assert "Новый пост на главной" in response.text
+
+
+@pytest.mark.asyncio
+async def test_warm_up_engine_prefills_pool():
+    """
+    Тест прогрева пула: соединения открыты заранее, частые запросы выполнены
+    на каждом из них, а данные не изменены.
+    """
+    import functools
+
+    from sqlalchemy import event
+
+    from app.core.config import settings
+    from app.core.database import InstrumentedQueuePool, _create_engine, warm_up_engine
+    from app.crud.post import post_crud
+
+    target = _create_engine(settings.TEST_DB_URL, poolclass=InstrumentedQueuePool, pool_size=3)
+    statements = []
+    event.listen(target.sync_engine, "after_cursor_execute", lambda *args: statements.append(args[2]))
+    try:
+        await warm_up_engine(target, 3, post_crud.warm_up)
+        pool = target.sync_engine.pool
+        assert pool.checkedin() == 3
+        assert pool.checkedout() == 0
+        assert any(statement.lstrip().upper().startswith("DELETE") for statement in statements)
+        assert not any(statement.lstrip().upper().startswith("INSERT") for statement in statements)
+
+        # Прогрев реплики выполняет только чтения
+        statements.clear()
+        await warm_up_engine(target, 1, functools.partial(post_crud.warm_up, read_only=True))
+        assert statements
+        assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+    finally:
+        await target.dispose()
+
+
+@pytest.mark.asyncio
+async def test_batch_read_update_delete(client: AsyncClient):
+    """
+    Тест пакетных операций: чтение по списку ID, массовое обновление
+    и удаление одним запросом к БД с отчетом об отсутствующих ID.
+    """
+    from app.core.query_budget import capture_queries
+
+    created = await client.post(
+        "/api/v1/posts/bulk",
+        json=[{"title": f"Пакет {i}", "content": "Содержимое пакетного поста"} for i in range(3)]
+    )
+    ids = [post["id"] for post in created.json()]
+    missing = max(ids) + 1000
+
+    with capture_queries() as queries:
+        response = await client.get("/api/v1/posts/", params={"ids": f"{ids[2]},{missing},{ids[0]}"})
+    assert response.status_code == 200
+    assert [post["id"] for post in response.json()] == [ids[2], ids[0]]
+    assert len(queries) == 1
+
+    response = await client.get("/api/v1/posts/", params={"ids": "1,abc"})
+    assert response.status_code == 400
+
+    with capture_queries() as queries:
+        response = await client.put(
+            "/api/v1/posts/bulk", json={"ids": [ids[0], ids[1], missing], "changes": {"title": "Переименован"}}
+        )
+    assert response.status_code == 200
+    result = response.json()
+    assert [post["title"] for post in result["updated"]] == ["Переименован", "Переименован"]
+    assert all(post["updated_at"] for post in result["updated"])
+    assert result["not_found"] == [missing]
+    assert len(queries) == 1
+
+    response = await client.put("/api/v1/posts/bulk", json={"ids": [ids[0]], "changes": {}})
+    assert response.status_code == 400
+
+    with capture_queries() as queries:
+        response = await client.delete("/api/v1/posts/bulk", params={"ids": f"{ids[1]},{missing},{ids[2]}"})
+    assert response.status_code == 200
+    result = response.json()
+    assert [post["id"] for post in result["deleted"]] == [ids[1], ids[2]]
+    assert result["not_found"] == [missing]
+    assert len(queries) == 1
+
+    response = await client.get(f"/api/v1/posts/{ids[1]}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_post_changes_feed(client: AsyncClient):
+    """
+    Тест ленты изменений: после токена выдаются только новые создания,
+    обновления и удаления, а затем — пустая порция с тем же положением.
+    """
+    import base64
+
+    response = await client.get("/api/v1/posts/changes", params={"limit": 1000})
+    assert response.status_code == 200
+    token = response.json()["next_token"]
+    while response.json()["has_more"]:
+        response = await client.get("/api/v1/posts/changes", params={"since": token, "limit": 1000})
+        token = response.json()["next_token"]
+
+    first = (await client.post("/api/v1/posts/", json={"title": "Лента 1", "content": "Содержимое для ленты"})).json()
+    second = (await client.post("/api/v1/posts/", json={"title": "Лента 2", "content": "Содержимое для ленты"})).json()
+    await client.put(f"/api/v1/posts/{first['id']}", json={"title": "Лента 1 изменен"})
+    await client.delete(f"/api/v1/posts/{second['id']}")
+
+    response = await client.get("/api/v1/posts/changes", params={"since": token, "limit": 1})
+    page = response.json()
+    assert page["has_more"] is True
+    changes = page["changes"]
+    response = await client.get("/api/v1/posts/changes", params={"since": page["next_token"]})
+    page = response.json()
+    assert page["has_more"] is False
+    changes += page["changes"]
+
+    # Второй пост создан и удален: в ленте остается только удаление
+    assert [(change["op"], change["id"]) for change in changes] == [
+        ("upsert", first["id"]),
+        ("delete", second["id"]),
+    ]
+    assert changes[0]["post"]["title"] == "Лента 1 изменен"
+
+    response = await client.get("/api/v1/posts/changes", params={"since": page["next_token"]})
+    assert response.json() == {"changes": [], "next_token": page["next_token"], "has_more": False}
+
+    response = await client.get("/api/v1/posts/changes", params={"since": "not-a-token"})
+    assert response.status_code == 400
+
+    # Токен прежнего формата (только номер изменения) принимается
+    legacy = base64.urlsafe_b64encode(b"[0]").decode().rstrip("=")
+    response = await client.get("/api/v1/posts/changes", params={"since": legacy, "limit": 1})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_post_events_broadcast(client: AsyncClient):
+    """
+    Тест рассылки событий: подписчик получает создание, изменение и удаление,
+    массовая операция занимает одно место в очереди, переполненная подписка
+    отключается, число подписчиков ограничено.
+    """
+    from app.core.config import settings
+    from app.core.events import Broadcaster, TooManySubscribers
+    from app.crud.post import post_crud
+
+    with post_crud.events.subscribe() as subscription:
+        created = (await client.post("/api/v1/posts/", json={"title": "Событие", "content": "Содержимое события"})).json()
+        await client.put(f"/api/v1/posts/{created['id']}", json={"title": "Событие изменено"})
+        await client.delete(f"/api/v1/posts/{created['id']}")
+
+        events = [await subscription.get() for _ in range(3)]
+        assert [(event["op"], [item["id"] for item in event["items"]]) for event in events] == [
+            ("create", [created["id"]]), ("update", [created["id"]]), ("delete", [created["id"]]),
+        ]
+        assert events[1]["items"][0]["post"]["title"] == "Событие изменено"
+
+        count = settings.POST_EVENTS_QUEUE_SIZE + 50
+        response = await client.post(
+            "/api/v1/posts/bulk",
+            json=[{"title": f"Массовое событие {i}", "content": "Содержимое события"} for i in range(count)],
+        )
+        assert response.status_code == 201
+        assert not subscription.overflowed
+        event = await subscription.get()
+        assert event["op"] == "create"
+        assert [item["id"] for item in event["items"]] == [post["id"] for post in response.json()]
+
+    broadcaster = Broadcaster(max_subscribers=1, queue_size=2)
+    slow = broadcaster.subscribe()
+    with pytest.raises(TooManySubscribers):
+        broadcaster.subscribe()
+    for i in range(3):
+        broadcaster.publish({"op": "create", "items": [{"id": i}]})
+    assert slow.overflowed
+    assert await slow.get() is None
+    # Отключенный подписчик освобождает место
+    broadcaster.subscribe()
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log(client: AsyncClient, monkeypatch):
+    """
+    Тест журнала медленных запросов: запись с методом CRUD и доступ
+    к журналу только с токеном отладки.
+    """
+    from app.core.config import settings
+    from app.core.database import slow_query_log
+
+    response = await client.get("/api/v1/diagnostics/slow-queries")
+    assert response.status_code == 404
+
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "secret")
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0.0)
+    slow_query_log.clear()
+    await client.get("/api/v1/posts/999999")
+    monkeypatch.setattr(slow_query_log, "threshold_ms", settings.SLOW_QUERY_THRESHOLD_MS)
+
+    response = await client.get("/api/v1/diagnostics/slow-queries", headers={"X-Debug-Token": "wrong"})
+    assert response.status_code == 403
+    response = await client.get("/api/v1/diagnostics/slow-queries", headers={"X-Debug-Token": "secret"})
+    assert response.status_code == 200
+    entries = response.json()["entries"]
+    assert entries
+    assert entries[0]["caller"] == "CRUDPost.get_post"
+    assert "999999" in entries[0]["parameters"]
+
+
+@pytest.mark.asyncio
+async def test_seed_posts_deterministic(client: AsyncClient):
+    """
+    Тест генератора данных: одинаковый seed дает одинаковые строки в заданных
+    границах, а загрузка добавляет их в базу.
+    """
+    from datetime import datetime, timedelta, timezone
+
+    from app.tools.seed import generate_rows, parse_distribution, seed_posts
+
+    end = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    start = end - timedelta(days=7)
+    params = (parse_distribution("normal:30:10"), parse_distribution("lognormal:5:0.5"), start, end)
+    rows = list(generate_rows(50, 7, *params))
+    assert rows == list(generate_rows(50, 7, *params))
+    assert rows != list(generate_rows(50, 8, *params))
+    assert all(1 <= len(title) <= 256 and len(content) >= 10 for title, content, _ in rows)
+    assert all(start <= created_at <= end for _, _, created_at in rows)
+
+    response = await client.get("/api/v1/posts/", params={"count": "exact", "limit": 1})
+    total = int(response.headers["X-Total-Count"])
+    assert await seed_posts(iter(rows), batch_size=20) == 50
+    response = await client.get("/api/v1/posts/", params={"count": "exact", "limit": 1})
+    assert int(response.headers["X-Total-Count"]) == total + 50
+
+
+@pytest.mark.asyncio
+async def test_suggest_post_titles(client: AsyncClient):
+    """
+    Тест автодополнения заголовков: регистронезависимый префикс, экранирование
+    спецсимволов LIKE и кэш, который поддерживают операции записи.
+    """
+    from app.core.query_budget import capture_queries
+
+    ids = []
+    for title in ("Autocomplete beta", "autocomplete Alpha", "Autocomplete 100% ready", "Other title"):
+        response = await client.post("/api/v1/posts/", json={"title": title, "content": "Содержимое для подсказок"})
+        ids.append(response.json()["id"])
+
+    response = await client.get("/api/v1/posts/titles/suggest", params={"prefix": "AUTOCOMPLETE "})
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()] == [
+        "Autocomplete 100% ready", "autocomplete Alpha", "Autocomplete beta",
+    ]
+    response = await client.get("/api/v1/posts/titles/suggest", params={"prefix": "autocomplete 100%"})
+    assert [item["id"] for item in response.json()] == [ids[2]]
+    response = await client.get("/api/v1/posts/titles/suggest", params={"prefix": "autocomplete _"})
+    assert response.json() == []
+
+    # Регистр не учитывается и для кириллицы
+    for title in ("Подсказка про кэш", "ПОДСКАЗКА заглавными", "подсказками"):
+        await client.post("/api/v1/posts/", json={"title": title, "content": "Содержимое для подсказок"})
+    for prefix in ("Подсказка", "пОДСКАЗКА"):
+        response = await client.get("/api/v1/posts/titles/suggest", params={"prefix": prefix})
+        assert [item["title"] for item in response.json()] == [
+            "ПОДСКАЗКА заглавными", "Подсказка про кэш", "подсказками",
+        ]
+    response = await client.get("/api/v1/posts/titles/suggest", params={"prefix": "подсказка п"})
+    assert [item["title"] for item in response.json()] == ["Подсказка про кэш"]
+
+    # Повторный запрос — из кэша, без обращения к БД
+    with capture_queries() as queries:
+        cached = await client.get("/api/v1/posts/titles/suggest", params={"prefix": "autocomplete "})
+    assert len(cached.json()) == 3
+    assert queries == []
+
+    # Запись с подходящим заголовком и удаление попавшего в подсказки поста обновляют кэш
+    await client.post("/api/v1/posts/", json={"title": "Autocomplete gamma", "content": "Содержимое для подсказок"})
+    await client.delete(f"/api/v1/posts/{ids[1]}")
+    response = await client.get("/api/v1/posts/titles/suggest", params={"prefix": "autocomplete "})
+    assert [item["title"] for item in response.json()] == [
+        "Autocomplete 100% ready", "Autocomplete beta", "Autocomplete gamma",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_post_activity_stats(client: AsyncClient):
+    """
+    Тест сводки активности: создание, изменение и удаление поста меняют
+    статистику текущего часа, а пересчет сводки дает те же значения.
+    """
+    from app.core.database import async_session
+    from app.crud.post import post_crud
+
+    async def current_hour():
+        response = await client.get("/api/v1/posts/stats")
+        assert response.status_code == 200
+        buckets = response.json()["buckets"]
+        if not buckets:
+            return 0, 0
+        last = buckets[-1]
+        return last["posts"], round(last["posts"] * last["avg_content_length"])
+
+    posts_before, length_before = await current_hour()
+    created = await client.post("/api/v1/posts/", json={"title": "Пост статистики", "content": "x" * 40})
+    post_id = created.json()["id"]
+    assert await current_hour() == (posts_before + 1, length_before + 40)
+
+    await client.put(f"/api/v1/posts/{post_id}", json={"title": "Пост статистики", "content": "x" * 100})
+    assert await current_hour() == (posts_before + 1, length_before + 100)
+
+    await client.delete(f"/api/v1/posts/{post_id}")
+    assert await current_hour() == (posts_before, length_before)
+
+    params = {"granularity": "day", "start": "2024-01-01T00:00:00Z"}
+    stats = (await client.get("/api/v1/posts/stats", params=params)).json()
+    async with async_session() as session:
+        assert await post_crud.rebuild_activity_rollups(session) > 0
+    assert (await client.get("/api/v1/posts/stats", params=params)).json() == stats
+    assert stats["total_posts"] == sum(bucket["posts"] for bucket in stats["buckets"])
+
+    response = await client.get("/api/v1/posts/stats", params={"granularity": "hour", "start": "2000-01-01T00:00:00Z"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_identical_reads(client: AsyncClient):
+    """
+    Тест объединения одинаковых конкурентных чтений: одновременные чтения
+    поста и страницы списка выполняют по одному запросу к БД, а ошибка
+    ведущего передается ожидающим.
+    """
+    import asyncio
+
+    from app.core.database import async_session
+    from app.core.query_budget import capture_queries
+    from app.core.singleflight import SingleFlight
+    from app.crud.post import CRUDPost
+
+    post_id = (await client.post(
+        "/api/v1/posts/", json={"title": "Популярный пост", "content": "Содержимое популярного поста"}
+    )).json()["id"]
+    crud = CRUDPost(reads=SingleFlight())
+
+    async def read_post():
+        async with async_session() as session:
+            return await crud.get_post_cached(session, post_id)
+
+    async def read_page():
+        async with async_session() as session:
+            return await crud.get_posts_rows(session, limit=5)
+
+    with capture_queries() as queries:
+        posts = await asyncio.gather(*(read_post() for _ in range(10)))
+        pages = await asyncio.gather(*(read_page() for _ in range(10)))
+    assert all(post.title == "Популярный пост" for post in posts)
+    assert all(page == pages[0] for page in pages)
+    assert len(queries) == 2
+    assert crud.reads.stats()["coalesced"] == 18
+
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["leaders"] == 1
+
+
+@pytest.mark.asyncio
+async def test_event_stream_ends_on_close_and_lifetime(monkeypatch):
+    """
+    Тест завершения потока событий: по остановке рассылки (сигнал остановки
+    приложения) и по истечении максимальной длительности потока.
+    """
+    import asyncio
+
+    from app.api.endpoints.posts import _event_stream
+    from app.core.config import settings
+    from app.core.events import Broadcaster, BroadcasterClosed
+
+    async def drain(stream):
+        return [chunk async for chunk in stream]
+
+    broadcaster = Broadcaster(max_subscribers=10, queue_size=10)
+    stream = asyncio.ensure_future(drain(_event_stream(broadcaster.subscribe())))
+    await asyncio.sleep(0.01)
+    # Событие массовой операции отправляется клиенту по одному событию на пост
+    broadcaster.publish({"op": "delete", "items": [{"id": 1}, {"id": 2}]})
+    await asyncio.sleep(0.01)
+    broadcaster.close()
+    assert await asyncio.wait_for(stream, timeout=1) == [
+        b"retry: 3000\n\n",
+        b'event: delete\ndata: {"op":"delete","id":1}\n\nevent: delete\ndata: {"op":"delete","id":2}\n\n',
+    ]
+    with pytest.raises(BroadcasterClosed):
+        broadcaster.subscribe()
+
+    monkeypatch.setattr(settings, "POST_EVENTS_MAX_STREAM_SECONDS", 0.05)
+    broadcaster = Broadcaster(max_subscribers=10, queue_size=10)
+    chunks = await asyncio.wait_for(drain(_event_stream(broadcaster.subscribe())), timeout=1)
+    assert chunks[0] == b"retry: 3000\n\n"
+    assert broadcaster.stats()["subscribers"] == 0